@@ -6,7 +6,7 @@ from pydantic import BaseModel, Field, model_validator
 
 from app.llm import LLM
 from app.logger import logger
-from app.schema import AgentState, Memory, Message
+from app.schema import AgentState, Memory, Message, Role
 
 
 class BaseAgent(BaseModel, ABC):
@@ -208,7 +208,7 @@ class BaseAgent(BaseModel, ABC):
         duplicate_count = sum(
             1
             for msg in reversed(self.memory.messages[:-1])
-            if msg.role == "assistant" and msg.content == last_message.content
+            if msg.role is Role.ASSISTANT and msg.content == last_message.content
         )
 
         # 如果重复次数达到阈值(默认2)，认为陷入死循环
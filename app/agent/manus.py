@@ -7,6 +7,7 @@ from app.tool.browser_use_tool import BrowserUseTool
 from app.tool.file_saver import FileSaver
 from app.tool.google_search import GoogleSearch
 from app.tool.python_execute import PythonExecute
+from app.tool.tool_collection import shared_tool
 
 # Manus 类继承自 ToolCallAgent 类，是一个多功能的通用代理类
 class Manus(ToolCallAgent):
@@ -34,6 +35,16 @@ class Manus(ToolCallAgent):
     # 向工具集合中添加通用工具
     available_tools: ToolCollection = Field(
         default_factory=lambda: ToolCollection(
-            PythonExecute(), GoogleSearch(), BrowserUseTool(), FileSaver(), Terminate()
+            PythonExecute(),
+            GoogleSearch(),
+            BrowserUseTool(),
+            FileSaver(),
+            shared_tool(Terminate),
         )
     )
+
+    async def cleanup(self):
+        """释放本代理的工具持有的资源；进程共享的浏览器和搜索会话在进程退出前单独关闭"""
+        for tool in self.available_tools:
+            if isinstance(tool, BrowserUseTool):
+                await tool.cleanup()
@@ -8,6 +8,7 @@ from app.logger import logger
 from app.prompt.planning import NEXT_STEP_PROMPT, PLANNING_SYSTEM_PROMPT
 from app.schema import Message, ToolCall
 from app.tool import PlanningTool, Terminate, ToolCollection
+from app.tool.tool_collection import shared_tool
 
 
 class PlanningAgent(ToolCallAgent):
@@ -27,12 +28,14 @@ class PlanningAgent(ToolCallAgent):
 
     # 可用工具集合，默认使用PlanningTool和Terminate工具
     available_tools: ToolCollection = Field(
-        default_factory=lambda: ToolCollection(PlanningTool(), Terminate())
+        default_factory=lambda: ToolCollection(PlanningTool(), shared_tool(Terminate))
     )
     # 工具选择模式，"none", "auto", "required" 之一，默认为 "auto"
     tool_choices: Literal["none", "auto", "required"] = "auto"
     # 特殊工具名称列表，默认为Terminate工具的名称
-    special_tool_names: List[str] = Field(default_factory=lambda: [Terminate().name])
+    special_tool_names: List[str] = Field(
+        default_factory=lambda: [shared_tool(Terminate).name]
+    )
 
     # 已调用工具列表，默认为空列表
     tool_calls: List[ToolCall] = Field(default_factory=list)
@@ -292,7 +295,9 @@ class PlanningAgent(ToolCallAgent):
 
 async def main():
     # 配置并运行代理,帮我计划一次去月球的旅行
-    agent = PlanningAgent(available_tools=ToolCollection(PlanningTool(), Terminate()))
+    agent = PlanningAgent(
+        available_tools=ToolCollection(PlanningTool(), shared_tool(Terminate))
+    )
     result = await agent.run("Help me plan a trip to the moon")
     print(result)
 
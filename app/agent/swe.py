@@ -5,6 +5,7 @@ from pydantic import Field
 from app.agent.toolcall import ToolCallAgent
 from app.prompt.swe import NEXT_STEP_TEMPLATE, SYSTEM_PROMPT
 from app.tool import Bash, StrReplaceEditor, Terminate, ToolCollection
+from app.tool.tool_collection import shared_tool
 
 class SWEAgent(ToolCallAgent):
     """一个实现了SWEAgent范式的代理，用于执行代码和进行自然对话"""
@@ -40,10 +41,11 @@ class SWEAgent(ToolCallAgent):
     def __init__(self):
         super().__init__()
         self.bash = Bash()
+        self.editor = StrReplaceEditor()
         self.available_tools = ToolCollection(
-            self.bash, StrReplaceEditor(), Terminate()
+            self.bash, self.editor, shared_tool(Terminate)
         )
-        self.special_tool_names = [Terminate().name]
+        self.special_tool_names = [shared_tool(Terminate).name]
 
     async def setup(self):
         """初始化工具"""
@@ -67,3 +69,4 @@ class SWEAgent(ToolCallAgent):
     async def teardown(self):
         """清理资源"""
         await self.bash.cleanup()
+        await self.editor.cleanup()
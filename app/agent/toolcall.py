@@ -8,6 +8,7 @@ from app.logger import logger
 from app.prompt.toolcall import NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.schema import AgentState, Message, ToolCall
 from app.tool import CreateChatCompletion, Terminate, ToolCollection
+from app.tool.tool_collection import shared_tool
 
 # 需要工具调用但未提供
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"
@@ -27,13 +28,15 @@ class ToolCallAgent(ReActAgent):
 
     # 可用工具集合，初始化时包含创建聊天完成和终止工具
     available_tools: ToolCollection = ToolCollection(
-        CreateChatCompletion(), Terminate()
+        shared_tool(CreateChatCompletion), shared_tool(Terminate)
     )
 
     # 工具选择模式，有"none"（不使用工具）、"auto"（自动决定是否使用工具）、"required"（必须使用工具），默认为"auto"
     tool_choices: Literal["none", "auto", "required"] = "auto"
     # 特殊工具名称列表，默认包含终止工具的名称
-    special_tool_names: List[str] = Field(default_factory=lambda: [Terminate().name])
+    special_tool_names: List[str] = Field(
+        default_factory=lambda: [shared_tool(Terminate).name]
+    )
     # 工具调用列表，默认为空列表
     tool_calls: List[ToolCall] = Field(default_factory=list)
     # 最大步骤数
@@ -196,18 +196,11 @@ class PlanningFlow(BaseFlow):
 
         try:
             # 直接从规划工具存储中访问计划数据
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
+            plan = self.planning_tool.plans[self.active_plan_id]
 
             # 找到第一个未完成的步骤
-            for i, step in enumerate(steps):
-                if i >= len(step_statuses):
-                    status = PlanStepStatus.NOT_STARTED.value
-                else:
-                    status = step_statuses[i]
-
-                if status in PlanStepStatus.get_active_statuses():
+            for i, step in enumerate(plan.steps):
+                if plan.status(i) in PlanStepStatus.get_active_statuses():
                     # 如果可用，提取步骤类型/类别
                     step_info = {"text": step}
 
@@ -229,14 +222,7 @@ class PlanningFlow(BaseFlow):
                     except Exception as e:
                         logger.warning(f"Error marking step as in_progress: {e}")
                         # 如果需要，直接更新步骤状态
-                        if i < len(step_statuses):
-                            step_statuses[i] = PlanStepStatus.IN_PROGRESS.value
-                        else:
-                            while len(step_statuses) < i:
-                                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-                            step_statuses.append(PlanStepStatus.IN_PROGRESS.value)
-
-                        plan_data["step_statuses"] = step_statuses
+                        plan.set_status(i, PlanStepStatus.IN_PROGRESS.value)
 
                     return i, step_info
 
@@ -295,16 +281,12 @@ class PlanningFlow(BaseFlow):
             logger.warning(f"Failed to update plan status: {e}")
             # 直接在规划工具存储中更新步骤状态
             if self.active_plan_id in self.planning_tool.plans:
-                plan_data = self.planning_tool.plans[self.active_plan_id]
-                step_statuses = plan_data.get("step_statuses", [])
-
-                # 确保step_statuses列表足够长
-                while len(step_statuses) <= self.current_step_index:
-                    step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-
-                # 更新状态
-                step_statuses[self.current_step_index] = PlanStepStatus.COMPLETED.value
-                plan_data["step_statuses"] = step_statuses
+                plan = self.planning_tool.plans[self.active_plan_id]
+                if 0 <= self.current_step_index < len(plan.steps):
+                    # 更新状态
+                    plan.set_status(
+                        self.current_step_index, PlanStepStatus.COMPLETED.value
+                    )
 
     async def _get_plan_text(self) -> str:
         """获取当前计划的格式化文本。"""
@@ -323,24 +305,14 @@ class PlanningFlow(BaseFlow):
             if self.active_plan_id not in self.planning_tool.plans:
                 return f"Error: Plan with ID {self.active_plan_id} not found"
 
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            title = plan_data.get("title", "Untitled Plan")
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
-            step_notes = plan_data.get("step_notes", [])
-
-            # 确保step_statuses和step_notes与步骤数量匹配
-            while len(step_statuses) < len(steps):
-                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-            while len(step_notes) < len(steps):
-                step_notes.append("")
+            plan = self.planning_tool.plans[self.active_plan_id]
+            title = plan.title or "Untitled Plan"
+            steps = plan.steps
+            step_statuses = plan.step_statuses
+            step_notes = plan.notes
 
             # 按状态统计步骤
-            status_counts = {status: 0 for status in PlanStepStatus.get_all_statuses()}
-
-            for status in step_statuses:
-                if status in status_counts:
-                    status_counts[status] += 1
+            status_counts = plan.status_counts()
 
             completed = status_counts[PlanStepStatus.COMPLETED.value]
             total = len(steps)
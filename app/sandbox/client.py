@@ -178,4 +178,6 @@ async def create_sandbox_client() -> LocalSandboxClient:
     return LocalSandboxClient()
 
 
-SANDBOX_CLIENT = create_sandbox_client()
\ No newline at end of file
+# create_sandbox_client is a coroutine function; instantiate directly so the
+# shared client is a real client rather than a never-awaited coroutine
+SANDBOX_CLIENT = LocalSandboxClient()
\ No newline at end of file
@@ -72,9 +72,7 @@ class SandboxManager:
         except ImageNotFound:
             try:
                 logger.info(f"Pulling image {image}...")
-                await asyncio.get_event_loop().run_in_executor(
-                    None, self._client.images.pull, image
-                )
+                await asyncio.to_thread(self._client.images.pull, image)
                 return True
             except (APIError, Exception) as e:
                 logger.error(f"Failed to pull image {image}: {e}")
@@ -98,7 +96,7 @@ class SandboxManager:
 
             self._active_operations.add(sandbox_id)
             try:
-                self._last_used[sandbox_id] = asyncio.get_event_loop().time()
+                self._last_used[sandbox_id] = asyncio.get_running_loop().time()
                 yield self._sandboxes[sandbox_id]
             finally:
                 self._active_operations.remove(sandbox_id)
@@ -133,7 +131,7 @@ class SandboxManager:
                 await sandbox.create()
 
                 self._sandboxes[sandbox_id] = sandbox
-                self._last_used[sandbox_id] = asyncio.get_event_loop().time()
+                self._last_used[sandbox_id] = asyncio.get_running_loop().time()
                 self._locks[sandbox_id] = asyncio.Lock()
 
                 logger.info(f"Created sandbox {sandbox_id}")
@@ -172,7 +170,7 @@ class SandboxManager:
 
     async def _cleanup_idle_sandboxes(self) -> None:
         """Cleans up idle sandboxes."""
-        current_time = asyncio.get_event_loop().time()
+        current_time = asyncio.get_running_loop().time()
         to_cleanup = []
 
         async with self._global_lock:
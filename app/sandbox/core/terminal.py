@@ -6,12 +6,12 @@ allowing interactive command execution with timeout control.
 
 import asyncio
 import re
+import shlex
 import socket
 from typing import Dict, Optional, Tuple, Union
 
 import docker
 from docker import APIClient
-from docker.errors import APIError
 from docker.models.containers import Container
 
 
@@ -37,7 +37,8 @@ class DockerSession:
         startup_command = [
             "bash",
             "-c",
-            f"cd {working_dir} && "
+            # 在同一次 exec 中创建并进入工作目录，无需单独执行 mkdir
+            f"mkdir -p {shlex.quote(working_dir)} && cd {shlex.quote(working_dir)} && "
             "PROMPT_COMMAND='' "
             "PS1='$ ' "
             "exec bash --norc --noprofile",
@@ -295,24 +296,13 @@ class AsyncDockerizedTerminal:
 
     async def init(self) -> None:
         """初始化终端环境。
-        确保工作目录存在并创建一个交互式会话。
+        创建一个交互式会话，会话启动时确保工作目录存在。
         异常：
             RuntimeError：如果初始化失败。
         """
-        await self._ensure_workdir()
         self.session = DockerSession(self.container.id)
         await self.session.create(self.working_dir, self.env_vars)
 
-    async def _ensure_workdir(self) -> None:
-        """确保容器中存在工作目录。
-        异常：
-            RuntimeError：如果目录创建失败。
-        """
-        try:
-            await self._exec_simple(f"mkdir -p {self.working_dir}")
-        except APIError as e:
-            raise RuntimeError(f"Failed to create working directory: {e}")
-
     async def _exec_simple(self, cmd: str) -> Tuple[int, str]:
         """使用Docker的exec_run执行一个简单的命令。
         参数：
@@ -1,7 +1,7 @@
-from enum import Enum
-from typing import Any, List, Literal, Optional, Union
+from enum import Enum, IntEnum
+from typing import Any, List, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 # 定义AgentState枚举类，继承自str和Enum
 class AgentState(str, Enum):
@@ -16,6 +16,21 @@ class AgentState(str, Enum):
     # 错误状态
     ERROR = "ERROR"
 
+# 定义Role枚举类，继承自IntEnum，角色以整数存储，仅在序列化时映射为字符串
+class Role(IntEnum):
+    """消息角色"""
+
+    SYSTEM = 0
+    USER = 1
+    ASSISTANT = 2
+    TOOL = 3
+
+
+# 角色序列化用的字符串表，按 Role 的整数值索引
+_ROLE_STR = ("system", "user", "assistant", "tool")
+# 字符串到 Role 的反向映射，用于兼容以字符串传入的角色
+_ROLE_BY_STR = {name: Role(i) for i, name in enumerate(_ROLE_STR)}
+
 # 定义Function数据模型类，继承自BaseModel
 class Function(BaseModel):
     # 名字
@@ -37,8 +52,8 @@ class ToolCall(BaseModel):
 class Message(BaseModel):
     """表示对话中的聊天消息"""
 
-    # 消息角色，只能是"system", "user", "assistant", "tool"中的一个
-    role: Literal["system", "user", "assistant", "tool"] = Field(...)
+    # 消息角色，Role 枚举之一，也接受"system", "user", "assistant", "tool"字符串
+    role: Role = Field(...)
     # 消息内容，可选，默认为None
     content: Optional[str] = Field(default=None)
     # 工具调用列表，可选，默认为None
@@ -48,6 +63,17 @@ class Message(BaseModel):
     # 工具调用标识，可选，默认为None
     tool_call_id: Optional[str] = Field(default=None)
 
+    # 在校验前将字符串角色转换为 Role，保持对旧调用方式的兼容
+    @field_validator("role", mode="before")
+    @classmethod
+    def _coerce_role(cls, v: Any) -> Any:
+        if isinstance(v, str):
+            try:
+                return _ROLE_BY_STR[v]
+            except KeyError:
+                raise ValueError(f"Invalid role: {v}") from None
+        return v
+
     # 重载加法运算符，支持Message + list或Message + Message的操作
     def __add__(self, other) -> List["Message"]:
         """支持 Message + list 或 Message + Message 的操作"""
@@ -77,7 +103,7 @@ class Message(BaseModel):
 
     # 将消息转换为字典格式
     def to_dict(self) -> dict:
-        message = {"role": self.role}
+        message = {"role": _ROLE_STR[self.role]}
         if self.content is not None:
             message["content"] = self.content
         if self.tool_calls is not None:
@@ -91,22 +117,22 @@ class Message(BaseModel):
     @classmethod
     def user_message(cls, content: str) -> "Message":
         """类方法，创建用户消息"""
-        return cls(role="user", content=content)
+        return cls(role=Role.USER, content=content)
 
     @classmethod
     def system_message(cls, content: str) -> "Message":
         """类方法，创建系统消息"""
-        return cls(role="system", content=content)
+        return cls(role=Role.SYSTEM, content=content)
 
     @classmethod
     def assistant_message(cls, content: Optional[str] = None) -> "Message":
         """类方法，创建助手消息"""
-        return cls(role="assistant", content=content)
+        return cls(role=Role.ASSISTANT, content=content)
 
     @classmethod
     def tool_message(cls, content: str, name, tool_call_id: str) -> "Message":
         """类方法，创建工具消息"""
-        return cls(role="tool", content=content, name=name, tool_call_id=tool_call_id)
+        return cls(role=Role.TOOL, content=content, name=name, tool_call_id=tool_call_id)
 
     @classmethod
     def from_tool_calls(
@@ -123,7 +149,7 @@ class Message(BaseModel):
             for call in tool_calls
         ]
         return cls(
-            role="assistant", content=content, tool_calls=formatted_calls, **kwargs
+            role=Role.ASSISTANT, content=content, tool_calls=formatted_calls, **kwargs
         )
 
 # 定义Memory数据模型类，继承自BaseModel
@@ -1,11 +1,33 @@
+import importlib
+
 # 从 **  模块中导入 ** 类
 from app.tool.base import BaseTool
-from app.tool.bash import Bash
-from app.tool.create_chat_completion import CreateChatCompletion
-from app.tool.planning import PlanningTool
-from app.tool.str_replace_editor import StrReplaceEditor
-from app.tool.terminate import Terminate
-from app.tool.tool_collection import ToolCollection
+
+# 工具类名到所在子模块的映射，首次访问时才导入对应模块（PEP 562），以减少启动耗时
+_name_map = {
+    "Bash": "bash",
+    "CreateChatCompletion": "create_chat_completion",
+    "PlanningTool": "planning",
+    "StrReplaceEditor": "str_replace_editor",
+    "Terminate": "terminate",
+    "ToolCollection": "tool_collection",
+}
+
+
+def __getattr__(name: str):
+    """按需导入工具类，保持 from app.tool import Bash 的用法不变"""
+    module_name = _name_map.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    # 缓存到模块全局变量，后续访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_name_map))
+
 
 #  定义 __all__ 列表，它指定了在使用 from module import * 这种导入方式时，哪些名称会被导入
 # 这里列出的类，在其他模块以 from module import * 导入此模块时会被导入
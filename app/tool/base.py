@@ -1,8 +1,10 @@
 #从 **  模块中导入 ** 类
+import dataclasses
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
 
 class BaseTool(ABC, BaseModel):
@@ -15,10 +17,8 @@ class BaseTool(ABC, BaseModel):
     description: str
     # 工具的参数，字典类型，默认值为 None
     parameters: Optional[dict] = None
-
-    # 内部类 Config，用于配置 pydantic 模型字段使用任意自定义类型
-    class Config:
-        arbitrary_types_allowed = True
+    # 工具是否无状态，无状态工具可通过 shared_tool 在多个代理之间共享同一实例
+    stateless: ClassVar[bool] = False
 
     # 定义 __call__ 异步可调用方法，它会调用 execute 方法
     async def __call__(self, **kwargs) -> Any:
@@ -42,42 +42,29 @@ class BaseTool(ABC, BaseModel):
             },
         }
 
-class ToolResult(BaseModel):
-    """表示工具执行的结果。"""
+@dataclass(slots=True, frozen=True)
+class ToolResult:
+    """表示工具执行的结果。纯数据载体，使用不可变的 slots 数据类以免除模型校验开销"""
 
     # 工具执行的输出，任意类型，默认值为 None
-    output: Any = Field(default=None)
+    output: Any = None
     # 工具执行过程中发生的错误，字符串类型，默认值为 None
-    error: Optional[str] = Field(default=None)
+    error: Optional[str] = None
      # 系统相关信息，字符串类型，默认值为 None
-    system: Optional[str] = Field(default=None)
-
-    # 内部类 Config，用于配置 pydantic 模型的行为
-    class Config:
-        arbitrary_types_allowed = True
+    system: Optional[str] = None
 
     # 定义布尔值判断方法，只要有任何一个字段有值就返回 True
     def __bool__(self):
-        return any(getattr(self, field) for field in self.model_fields)
+        return bool(self.output or self.error or self.system)
 
     # 定义加法运算符重载方法，用于合并两个 ToolResult 对象
     def __add__(self, other: "ToolResult"):
-        # 定义一个内部函数用于合并字段
-        def combine_fields(
-            field: Optional[str], other_field: Optional[str], concatenate: bool = True
-        ):
-            if field and other_field:
-                if concatenate:
-                     # 如果两个字段都有值且 concatenate 为 True，则拼接两个字段 为返回值
-                    return field + other_field
-                raise ValueError("Cannot combine tool results")
-            return field or other_field
-        
-        # 返回一个新的 ToolResult 对象，包含合并后的字段
+        # 两个字段都有值时拼接，否则取有值的一方；直接内联以避免每次合并创建闭包和额外函数调用
+        output, error, system = self.output, self.error, self.system
         return ToolResult(
-            output=combine_fields(self.output, other.output),
-            error=combine_fields(self.error, other.error),
-            system=combine_fields(self.system, other.system),
+            output=output + other.output if output and other.output else output or other.output,
+            error=error + other.error if error and other.error else error or other.error,
+            system=system + other.system if system and other.system else system or other.system,
         )
 
     # 定义字符串表示方法，如果有错误则返回错误信息，否则返回输出
@@ -88,12 +75,13 @@ class ToolResult(BaseModel):
         """
         返回一个新的ToolResult，其中给定字段已被替换
         """
-        # return self.copy(update=kwargs)
-        return type(self)(**{**self.model_dump(), **kwargs})
+        return dataclasses.replace(self, **kwargs)
 
+@dataclass(slots=True, frozen=True)
 class CLIResult(ToolResult):
     """一个可以作为命令行界面输出渲染的ToolResult。"""
 
+@dataclass(slots=True, frozen=True)
 class ToolFailure(ToolResult):
     """一个表示失败的ToolResult"""
     
@@ -1,5 +1,4 @@
 import asyncio
-import os
 from typing import Optional
 from app.sandbox.client import LocalSandboxClient
 from app.exceptions import ToolError
@@ -19,6 +18,19 @@ from app.tool.base import BaseTool, CLIResult, ToolResult
 # """
 _BASH_DESCRIPTION = """Executes bash commands in a sandboxed environment."""
 
+# 命令输出的默认字节上限，超过时保留首尾各一半，中间以省略标记代替
+MAX_OUTPUT_BYTES: int = 1 << 20
+# 截断输出时插入的标记
+_TRUNCATED_MARKER: bytes = b"\n...[truncated]...\n"
+
+
+def _truncate_middle(data: bytes, max_bytes: int = MAX_OUTPUT_BYTES) -> bytes:
+    """如果输出超过 max_bytes，保留开头和结尾各 max_bytes // 2 字节，丢弃中间部分"""
+    if len(data) <= max_bytes:
+        return data
+    half = max_bytes // 2
+    return data[:half] + _TRUNCATED_MARKER + data[-half:]
+
 class _BashSession:
     """创建 bash shells 会话类。"""
     
@@ -36,10 +48,11 @@ class _BashSession:
     # 用于标识命令输出结束的哨兵字符串
     _sentinel: str = "<<exit>>"
 
-    # 初始化函数，默认是否
-    def __init__(self):
+    # 初始化函数，默认是否；max_output_bytes 为单条命令输出的字节上限
+    def __init__(self, max_output_bytes: int = MAX_OUTPUT_BYTES):
         self._started = False
         self._timed_out = False
+        self._max_output_bytes = max_output_bytes
 
     # 异步启动
     async def start(self):
@@ -50,10 +63,8 @@ class _BashSession:
         # 创建一个异步子进程来运行 bash 命令
         self._process = await asyncio.create_subprocess_shell(
             self.command,
-            # 设置在子进程启动前调用 os.setsid 函数，用于创建新的进程组
-            preexec_fn=os.setsid,
-            # 使用 shell 来执行命令
-            shell=True,
+            # 在子进程中创建新会话（等价于 setsid），由 C 层在 fork 后直接完成，无需 Python 回调
+            start_new_session=True,
             # 设置缓冲区大小为 0，即无缓冲
             bufsize=0,
             # 将标准输入、输出、错误设置为管道，以便向进程发送数据
@@ -109,6 +120,7 @@ class _BashSession:
         await self._process.stdin.drain()
 
         
+        sentinel = self._sentinel.encode()
         # 从进程中读取输出，直到找到哨兵
         try:
             # 尝试在超时时间内读取命令输出
@@ -117,13 +129,15 @@ class _BashSession:
                     # 等待一段时间，避免频繁读取
                     await asyncio.sleep(self._output_delay)
                     # 如果我们直接从 stdout/stderr 读取，它将永远等待EOF。直接从 StreamReader 的缓冲区读取输出，避免等待 EOF
-                    output = (
-                        self._process.stdout._buffer.decode()
-                    )  # pyright: ignore[reportAttributeAccessIssue]
+                    # 在字节缓冲区上查找哨兵，不在每次轮询时解码整个输出
+                    buffer = self._process.stdout._buffer  # pyright: ignore[reportAttributeAccessIssue]
+                    end = buffer.find(sentinel)
                     # 如果输出含有退出哨兵
-                    if self._sentinel in output:
-                        # 移除退出哨兵并退出循环
-                        output = output[: output.index(self._sentinel)]
+                    if end != -1:
+                        # 移除退出哨兵，只解码截断后的部分并退出循环
+                        output = _truncate_middle(
+                            bytes(buffer[:end]), self._max_output_bytes
+                        ).decode(errors="replace")
                         break
         #     如果超时，设置超时标志并抛出异常        
         except asyncio.TimeoutError:
@@ -138,9 +152,10 @@ class _BashSession:
             output = output[:-1]
 
         # 读取标准错误输出
-        error = (
-            self._process.stderr._buffer.decode()
-        )  # pyright: ignore[reportAttributeAccessIssue]
+        error = _truncate_middle(
+            bytes(self._process.stderr._buffer),  # pyright: ignore[reportAttributeAccessIssue]
+            self._max_output_bytes,
+        ).decode(errors="replace")
         
         # 除换行符
         if error.endswith("\n"):
@@ -175,6 +190,9 @@ class Bash(BaseTool):
         # 要求必须提供 "command" 参数
     }
 
+    # 单条命令输出的字节上限，超过时截掉中间部分
+    max_output_bytes: int = MAX_OUTPUT_BYTES
+
     # 用于存储 _BashSession 实例的变量，初始值为 None
     # _session: Optional[_BashSession] = None
 
@@ -236,6 +254,11 @@ class Bash(BaseTool):
                     return ToolResult(system="Command interrupted (simulated).")
                 timeout = kwargs.get("timeout", 120)  # 默认 120 秒
                 output = await self._client.run_command(command, timeout=timeout)
+                # UTF-8 每个字符最多 4 字节，字符数不足上限的 1/4 时不可能超限，无需编码
+                if len(output) > self.max_output_bytes // 4:
+                    output = _truncate_middle(
+                        output.encode(), self.max_output_bytes
+                    ).decode(errors="replace")
                 return CLIResult(output=output, error="")
             except TimeoutError as e:
                 raise ToolError(f"timed out: command '{command}' did not complete in {timeout} seconds")
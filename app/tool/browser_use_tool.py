@@ -1,15 +1,38 @@
 import asyncio
+import hashlib
 import json
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
-from browser_use import Browser as BrowserUseBrowser
-from browser_use import BrowserConfig
-from browser_use.browser.context import BrowserContext
-from browser_use.dom.service import DomService
-from pydantic import Field, field_validator
+from pydantic import ConfigDict, Field, TypeAdapter, field_validator
+
+# orjson 为可选依赖，缺失时回退到标准库 json
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 from pydantic_core.core_schema import ValidationInfo
+
 from app.tool.base import BaseTool, ToolResult
 
+# browser_use 会连带导入 Playwright，启动开销较大，只在真正使用浏览器时才导入
+if TYPE_CHECKING:
+    from browser_use import Browser as BrowserUseBrowser
+    from browser_use.browser.context import BrowserContext
+    from browser_use.dom.service import DomService
+
 # 与web浏览器交互以执行各种操作，如导航、元素、内容提取和标签管理。支持的操作包括:
 # - 'navigate'：访问特定URL
 # - 'click'：通过索引点击元素
@@ -39,8 +62,139 @@ content extraction, and tab management. Supported actions include:
 - 'new_tab': Open a new tab
 - 'close_tab': Close the current tab
 - 'refresh': Refresh the current page
+- 'chain': Run a list of the actions above in order and return the page state afterwards
 """
 
+# 会修改页面的写操作，链式操作执行期间拒绝单独调用这些操作
+_WRITE_ACTIONS = frozenset(
+    {
+        "navigate",
+        "click",
+        "input_text",
+        "execute_js",
+        "scroll",
+        "switch_tab",
+        "new_tab",
+        "close_tab",
+        "refresh",
+        "chain",
+    }
+)
+
+class _BrowserPool:
+    """进程级浏览器池：整个进程只启动一个浏览器，各工具实例各自持有独立的上下文。
+
+    上下文保存着 cookie、localStorage 和打开的标签页，归还时直接关闭而不复用，
+    以免下一个工具实例继承上一个会话的登录状态。
+    """
+
+    # 共享的浏览器实例
+    _browser: Optional["BrowserUseBrowser"] = None
+    # 保护浏览器创建的锁，首次使用时在当前事件循环中创建
+    _lock: Optional[asyncio.Lock] = None
+    # 锁和浏览器所属的事件循环
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def _bind_loop(cls) -> None:
+        """锁和浏览器都绑定在创建它们的事件循环上，循环变化后丢弃旧对象重新创建"""
+        loop = asyncio.get_running_loop()
+        if cls._loop is not loop:
+            cls._loop = loop
+            cls._lock = asyncio.Lock()
+            cls._browser = None
+
+    @classmethod
+    async def get_browser(cls) -> "BrowserUseBrowser":
+        """获取共享浏览器，不存在时创建"""
+        cls._bind_loop()
+        async with cls._lock:
+            if cls._browser is None:
+                from browser_use import Browser as BrowserUseBrowser
+                from browser_use import BrowserConfig
+
+                cls._browser = BrowserUseBrowser(BrowserConfig(headless=False))
+            return cls._browser
+
+    @classmethod
+    async def acquire_context(cls) -> "BrowserContext":
+        """在共享浏览器上新建一个上下文"""
+        browser = await cls.get_browser()
+        return await browser.new_context()
+
+    @classmethod
+    async def release_context(cls, context: "BrowserContext") -> None:
+        """关闭上下文，连同其中的 cookie、存储和标签页一起丢弃"""
+        await context.close()
+
+    @classmethod
+    async def close(cls) -> None:
+        """关闭共享浏览器；浏览器属于其他事件循环时无法关闭，只丢弃引用"""
+        browser, cls._browser = cls._browser, None
+        if browser is not None and cls._loop is asyncio.get_running_loop():
+            await browser.close()
+
+
+# get_html 和 get_text 返回的最大字符数
+MAX_HTML_LENGTH = 2000
+MAX_TEXT_LENGTH = 4000
+
+
+def _truncate_js(expr: str, limit: int) -> str:
+    """生成在页面内截断字符串的 JavaScript 表达式，只把截断后的结果传回 Python"""
+    return f"(() => {{ const s = {expr}; return s.length > {limit} ? s.slice(0, {limit}) + '...' : s; }})()"
+
+
+def _dumps(data: dict) -> str:
+    """将状态信息序列化为 JSON 字符串，优先使用更快的 orjson"""
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(item_type: type) -> TypeAdapter:
+    """按元素类型缓存列表的 TypeAdapter，一次调用完成整个列表的序列化"""
+    return TypeAdapter(List[item_type])
+
+
+# 输出固定的结果，ToolResult 不可变，可直接复用同一实例
+_SCREENSHOT_UNCHANGED = ToolResult(output="Screenshot unchanged")
+_TAB_CLOSED = ToolResult(output="Closed current tab")
+_PAGE_REFRESHED = ToolResult(output="Refreshed current page")
+
+# 各操作的必需参数及缺失时的错误信息，运行时校验只需查表一次
+_ACTION_REQUIRES: Mapping[str, Tuple[Tuple[str, ...], str]] = MappingProxyType(
+    {
+        "navigate": (("url",), "URL is required for 'navigate' action"),
+        "click": (("index",), "Index is required for 'click' action"),
+        "input_text": (
+            ("index", "text"),
+            "Index and text are required for 'input_text' action",
+        ),
+        "execute_js": (("script",), "Script is required for 'execute_js' action"),
+        "scroll": (
+            ("scroll_amount",),
+            "Scroll amount is required for 'scroll' action",
+        ),
+        "switch_tab": (("tab_id",), "Tab ID is required for 'switch_tab' action"),
+        "new_tab": (("url",), "URL is required for 'new_tab' action"),
+    }
+)
+
+
+def _validate(action: str, values: dict) -> Optional[str]:
+    """校验操作的必需参数，缺失时返回错误信息，否则返回 None"""
+    required = _ACTION_REQUIRES.get(action)
+    if required is None:
+        return None
+    names, message = required
+    # None 和空字符串都视为缺失，0 是合法的索引或滚动距离
+    if any(values.get(name) in (None, "") for name in names):
+        return message
+    return None
+
+
 # 定义了 BrowserUseTool ，继承 BaseTool
 class BrowserUseTool(BaseTool):
     # 名字
@@ -67,6 +221,7 @@ class BrowserUseTool(BaseTool):
                     "new_tab", # 打开新的标签页
                     "close_tab", # 关闭当前标签页
                     "refresh", # 刷新当前页面
+                    "chain", # 依次执行多个操作
                 ],
                 "description": "The browser action to perform",},
                 # 游览器可执行操作
@@ -93,6 +248,11 @@ class BrowserUseTool(BaseTool):
                 "type": "integer",
                 "description": "Tab ID for 'switch_tab' action",},
                 # 标签页ID，用于切换标签页操作
+            "steps": {
+                "type": "array",
+                "description": "Ordered list of actions for 'chain' action; each item is an object with 'action' and that action's parameters",
+                "items": {"type": "object"},},
+                # 用于'chain'操作的步骤列表，每一项包含 action 及其参数
         },
         # 必须包含action参数
         "required": ["action"],
@@ -105,17 +265,26 @@ class BrowserUseTool(BaseTool):
             "switch_tab": ["tab_id"],
             "new_tab": ["url"],
             "scroll": ["scroll_amount"],
+            "chain": ["steps"],
         },
     }
 
     # 定义异步锁，用于线程安全地访问共享资源
     lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
-    # 浏览器对象，初始为 None，exclude=True 表示在某些序列化操作中排除该字段
-    browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)
+    # 浏览器对象，指向进程共享的浏览器，初始为 None，exclude=True 表示在某些序列化操作中排除该字段
+    # 字段类型声明为 Any，避免定义模型时就导入 browser_use
+    browser: Optional[Any] = Field(default=None, exclude=True)  # BrowserUseBrowser
     # 浏览器上下文对象，初始为None，exclude=True表示在某些序列化操作中排除该字段
-    context: Optional[BrowserContext] = Field(default=None, exclude=True)
+    context: Optional[Any] = Field(default=None, exclude=True)  # BrowserContext
     # DOM服务对象，初始为None，exclude=True表示在某些序列化操作中排除该字段
-    dom_service: Optional[DomService] = Field(default=None, exclude=True)
+    dom_service: Optional[Any] = Field(default=None, exclude=True)  # DomService
+    # 是否有链式操作正在执行
+    _chain_active: bool = False
+    # 上一次截图的 SHA-256，页面未变化时不再返回截图数据
+    _last_screenshot_hash: Optional[str] = None
+
+    # 浏览器、上下文等字段是第三方类型，需要允许任意类型
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
     # 参数验证器，在参数验证之前执行
     @field_validator("parameters", mode="before")
@@ -126,14 +295,16 @@ class BrowserUseTool(BaseTool):
         # 正常返回验证后的参数    
         return v
 
-    async def _ensure_browser_initialized(self) -> BrowserContext:
+    async def _ensure_browser_initialized(self) -> "BrowserContext":
         """确保浏览器和上下文已初始化的异步方法"""
-        # 如果浏览器对象为空，则创建一个新的浏览器对象
+        # 如果浏览器对象为空，则获取进程共享的浏览器
         if self.browser is None:
-            self.browser = BrowserUseBrowser(BrowserConfig(headless=False))
-        # 如果上下文对象为空，则创建一个新的上下文对象，并初始化DOM服务
+            self.browser = await _BrowserPool.get_browser()
+        # 如果上下文对象为空，则从浏览器池获取一个上下文，并初始化DOM服务
         if self.context is None:
-            self.context = await self.browser.new_context()
+            from browser_use.dom.service import DomService
+
+            self.context = await _BrowserPool.acquire_context()
             self.dom_service = DomService(await self.context.get_current_page())
         # 返回上下文对象    
         return self.context
@@ -148,6 +319,7 @@ class BrowserUseTool(BaseTool):
         script: Optional[str] = None,
         scroll_amount: Optional[int] = None,
         tab_id: Optional[int] = None,
+        steps: Optional[List[dict]] = None,
         **kwargs,
     ) -> ToolResult:
         """
@@ -160,168 +332,242 @@ class BrowserUseTool(BaseTool):
             script: 执行的动作的JavaScript代码
             scroll_amount: 滚动动作的像素数
             tab_id: 切换标签页动作的标签ID
+            steps: 链式动作依次执行的操作列表
             **kwargs: 额外的参数
         Returns:
             包含操作输出或错误的ToolResult
         """
         
+        # 链式操作执行期间拒绝单独的写操作，避免与链中的步骤交错
+        if self._chain_active and action in _WRITE_ACTIONS:
+            return ToolResult(
+                error=f"Cannot run '{action}' while a chain of actions is in progress"
+            )
+
         # 使用异步锁确保线程安全
         async with self.lock:
             try:
                 # 确保浏览器和上下文已初始化
                 context = await self._ensure_browser_initialized()
+                # 链式操作：一次加锁、一次初始化内执行全部步骤
+                if action == "chain":
+                    return await self._run_chain(context, steps)
+                return await self._dispatch(
+                    context,
+                    action,
+                    url=url,
+                    index=index,
+                    text=text,
+                    script=script,
+                    scroll_amount=scroll_amount,
+                    tab_id=tab_id,
+                    **kwargs,
+                )
+            # 捕获异常并返回错误结果
+            except Exception as e:
+                return ToolResult(error=f"Browser action '{action}' failed: {str(e)}")
 
-                # 如果操作是导航
-                if action == "navigate":
-                    # 如果URL为空，返回错误结果
-                    if not url:
-                        return ToolResult(error="URL is required for 'navigate' action")
-                    # 执行导航操作
-                    await context.navigate_to(url)
-                    # 返回成功结果
-                    return ToolResult(output=f"Navigated to {url}")
-
-                # 如果操作是点击
-                elif action == "click":
-                    # 如果索引为空，返回错误结果
-                    if index is None:
-                        return ToolResult(error="Index is required for 'click' action")
-                    # 获取指定索引的DOM元素
-                    element = await context.get_dom_element_by_index(index)
-                    # 如果元素不存在，返回错误结果
-                    if not element:
-                        return ToolResult(error=f"Element with index {index} not found")
-                     # 点击元素并获取可能的下载路径
-                    download_path = await context._click_element_node(element)
-                    # 构建输出信息
-                    output = f"Clicked element at index {index}"
-                    if download_path:
-                        output += f" - Downloaded file to {download_path}"
-                    # 返回成功结果
-                    return ToolResult(output=output)
-                
-                # 如果操作是输入文本
-                elif action == "input_text":
-                    # 如果索引或文本为空，返回错误结果
-                    if index is None or not text:
-                        return ToolResult(
-                            error="Index and text are required for 'input_text' action"
-                        )
-                    # 获取指定索引的DOM元素
-                    element = await context.get_dom_element_by_index(index)
-                    # 如果元素不存在，返回错误结果
-                    if not element:
-                        return ToolResult(error=f"Element with index {index} not found")
-                    # 在元素中输入文本
-                    await context._input_text_element_node(element, text)
-                    # 返回成功结果
-                    return ToolResult(
-                        output=f"Input '{text}' into element at index {index}"
-                    )
-                
-                # 如果操作是截取屏幕截图
-                elif action == "screenshot":
-                    # 截取全屏截图
-                    screenshot = await context.take_screenshot(full_page=True)
-                     # 返回成功结果，包含截图信息
-                    return ToolResult(
-                        output=f"Screenshot captured (base64 length: {len(screenshot)})",
-                        system=screenshot,
-                    )
-                
-                # 如果操作是获取页面HTML
-                elif action == "get_html":
-                    # 获取页面HTML
-                    html = await context.get_page_html()
-                    # 如果HTML过长，截断并添加省略号
-                    truncated = html[:2000] + "..." if len(html) > 2000 else html
-                    # 返回成功结果
-                    return ToolResult(output=truncated)
-
-                # 如果操作是获取页面文本
-                elif action == "get_text":
-                    text = await context.execute_javascript("document.body.innerText")
-                    return ToolResult(output=text)
-
-                # 如果操作是获取页面所有链接
-                elif action == "read_links":
-                    links = await context.execute_javascript(
-                        "document.querySelectorAll('a[href]').forEach((elem) => {if (elem.innerText) {console.log(elem.innerText, elem.href)}})"
-                    )
-                    return ToolResult(output=links)
-                
-                # 如果操作是执行JavaScript代码
-                elif action == "execute_js":
-                    # 如果脚本为空，返回错误结果
-                    if not script:
-                        return ToolResult(
-                            error="Script is required for 'execute_js' action"
-                        )
-                    # 执行JavaScript代码并获取结果
-                    result = await context.execute_javascript(script)
-                    # 返回成功结果
-                    return ToolResult(output=str(result))
-
-                # 如果操作是滚动页面
-                elif action == "scroll":
-                    # 如果滚动距离为空，返回错误结果
-                    if scroll_amount is None:
-                        return ToolResult(
-                            error="Scroll amount is required for 'scroll' action"
-                        )
-                    # 执行滚动操作
-                    await context.execute_javascript(
-                        f"window.scrollBy(0, {scroll_amount});"
-                    )
-                    # 确定滚动方向
-                    direction = "down" if scroll_amount > 0 else "up"
-                    # 返回成功结果
+    async def _run_chain(
+        self, context: "BrowserContext", steps: Optional[List[dict]]
+    ) -> ToolResult:
+        """依次执行多个操作，结束后附加一次页面状态观察"""
+        if not steps:
+            return ToolResult(error="Steps are required for 'chain' action")
+
+        self._chain_active = True
+        outputs = []
+        system = None
+        try:
+            for i, step in enumerate(steps):
+                step_action = step.get("action")
+                # 不支持嵌套的链式操作
+                if step_action == "chain":
+                    return ToolResult(error="Nested 'chain' actions are not supported")
+                result = await self._dispatch(context, **step)
+                # 任一步骤失败即停止，并返回已完成步骤的输出
+                if result.error:
                     return ToolResult(
-                        output=f"Scrolled {direction} by {abs(scroll_amount)} pixels"
+                        output="\n".join(outputs) or None,
+                        error=f"Step {i} ({step_action}) failed: {result.error}",
                     )
-                # 如果操作是切换标签页
-                elif action == "switch_tab":
-                    # 如果标签页ID为空，返回错误结果
-                    if tab_id is None:
-                        return ToolResult(
-                            error="Tab ID is required for 'switch_tab' action"
-                        )
-                    # 切换到指定标签页
-                    await context.switch_to_tab(tab_id)
-                    # 返回成功结果
-                    return ToolResult(output=f"Switched to tab {tab_id}")
-
-                # 如果操作是打开新标签页
-                elif action == "new_tab":
-                    # 如果URL为空，返回错误结果
-                    if not url:
-                        return ToolResult(error="URL is required for 'new_tab' action")
-                    # 打开新标签页
-                    await context.create_new_tab(url)
-                    # 返回成功结果
-                    return ToolResult(output=f"Opened new tab with URL {url}")
-                
-                # 如果操作是关闭当前标签页
-                elif action == "close_tab":
-                    # 关闭当前标签页
-                    await context.close_current_tab()
-                    # 返回成功结果
-                    return ToolResult(output="Closed current tab")
-
-                # 如果操作是刷新当前页面
-                elif action == "refresh":
-                    # 刷新当前页面
-                    await context.refresh_page()
-                    # 返回成功结果
-                    return ToolResult(output="Refreshed current page")
-                
-                # 如果是未知操作，返回错误结果
-                else:
-                    return ToolResult(error=f"Unknown action: {action}")
-             # 捕获异常并返回错误结果
-            except Exception as e:
-                return ToolResult(error=f"Browser action '{action}' failed: {str(e)}")
-     
+                outputs.append(f"Step {i}: {result.output}")
+                system = result.system or system
+            # 最后一步之后自动附加当前页面状态
+            state_info = await self._get_state_info(context)
+            outputs.append(f"Current state: {_dumps(state_info)}")
+            return ToolResult(output="\n".join(outputs), system=system)
+        finally:
+            self._chain_active = False
+
+    async def _dispatch(
+        self, context: "BrowserContext", action: Optional[str] = None, **kwargs
+    ) -> ToolResult:
+        """在已初始化的上下文上执行单个浏览器操作"""
+        # 通过操作表查找处理函数
+        handler = self._ACTIONS.get(action)
+        # 如果是未知操作，返回错误结果
+        if handler is None:
+            return ToolResult(error=f"Unknown action: {action}")
+        # 校验必需参数
+        error = _validate(action, kwargs)
+        if error:
+            return ToolResult(error=error)
+        return await handler(self, context, **kwargs)
+
+    @staticmethod
+    async def _get_element(context: "BrowserContext", index: int):
+        """从上下文缓存的选择器映射中查找元素，索引不存在时返回 None"""
+        # 选择器映射在最近一次获取页面状态时生成，这里直接读取而不重新解析 DOM；
+        # get_dom_element_by_index 对未知索引会抛出 KeyError，改用 get 返回 None
+        selector_map = await context.get_selector_map()
+        return selector_map.get(index)
+
+    # 导航到指定URL
+    async def _do_navigate(self, context: "BrowserContext", *, url: str, **_) -> ToolResult:
+        # 执行导航操作，导航后页面变化，清除截图哈希
+        await context.navigate_to(url)
+        self._last_screenshot_hash = None
+        # 返回成功结果
+        return ToolResult(output=f"Navigated to {url}")
+
+    # 点击指定索引的元素
+    async def _do_click(self, context: "BrowserContext", *, index: int, **_) -> ToolResult:
+        # 获取指定索引的DOM元素
+        element = await self._get_element(context, index)
+        # 如果元素不存在，返回错误结果
+        if not element:
+            return ToolResult(error=f"Element with index {index} not found")
+        # 点击元素并获取可能的下载路径
+        download_path = await context._click_element_node(element)
+        # 构建输出信息
+        output = f"Clicked element at index {index}"
+        if download_path:
+            output += f" - Downloaded file to {download_path}"
+        # 返回成功结果
+        return ToolResult(output=output)
+
+    # 在指定索引的元素中输入文本
+    async def _do_input_text(
+        self, context: "BrowserContext", *, index: int, text: str, **_
+    ) -> ToolResult:
+        # 获取指定索引的DOM元素
+        element = await self._get_element(context, index)
+        # 如果元素不存在，返回错误结果
+        if not element:
+            return ToolResult(error=f"Element with index {index} not found")
+        # 在元素中输入文本
+        await context._input_text_element_node(element, text)
+        # 返回成功结果
+        return ToolResult(output=f"Input '{text}' into element at index {index}")
+
+    # 截取屏幕截图
+    async def _do_screenshot(self, context: "BrowserContext", **_) -> ToolResult:
+        # 截取全屏截图
+        screenshot = await context.take_screenshot(full_page=True)
+        # 与上一次截图哈希相同则说明页面未变化，不再返回截图数据
+        digest = hashlib.sha256(
+            screenshot.encode() if isinstance(screenshot, str) else screenshot
+        ).hexdigest()
+        if digest == self._last_screenshot_hash:
+            return _SCREENSHOT_UNCHANGED
+        self._last_screenshot_hash = digest
+        # 返回成功结果，包含截图信息
+        return ToolResult(
+            output=f"Screenshot captured (base64 length: {len(screenshot)})",
+            system=screenshot,
+        )
+
+    # 获取页面HTML
+    async def _do_get_html(self, context: "BrowserContext", **_) -> ToolResult:
+        # 在页面中截断，只传回前 MAX_HTML_LENGTH 个字符，过长时添加省略号
+        html = await context.execute_javascript(
+            _truncate_js("document.documentElement.outerHTML", MAX_HTML_LENGTH)
+        )
+        # 返回成功结果
+        return ToolResult(output=html)
+
+    # 获取页面文本
+    async def _do_get_text(self, context: "BrowserContext", **_) -> ToolResult:
+        # 同样在页面中截断文本，避免传输整页内容
+        text = await context.execute_javascript(
+            _truncate_js("document.body.innerText", MAX_TEXT_LENGTH)
+        )
+        return ToolResult(output=text)
+
+    # 获取页面所有链接
+    async def _do_read_links(self, context: "BrowserContext", **_) -> ToolResult:
+        links = await context.execute_javascript(
+            "document.querySelectorAll('a[href]').forEach((elem) => {if (elem.innerText) {console.log(elem.innerText, elem.href)}})"
+        )
+        return ToolResult(output=links)
+
+    # 执行JavaScript代码
+    async def _do_execute_js(
+        self, context: "BrowserContext", *, script: str, **_
+    ) -> ToolResult:
+        # 执行JavaScript代码并获取结果
+        result = await context.execute_javascript(script)
+        # 返回成功结果
+        return ToolResult(output=str(result))
+
+    # 滚动页面
+    async def _do_scroll(
+        self, context: "BrowserContext", *, scroll_amount: int, **_
+    ) -> ToolResult:
+        # 执行滚动操作
+        await context.execute_javascript(f"window.scrollBy(0, {scroll_amount});")
+        # 确定滚动方向
+        direction = "down" if scroll_amount > 0 else "up"
+        # 返回成功结果
+        return ToolResult(output=f"Scrolled {direction} by {abs(scroll_amount)} pixels")
+
+    # 切换到指定ID的标签页
+    async def _do_switch_tab(
+        self, context: "BrowserContext", *, tab_id: int, **_
+    ) -> ToolResult:
+        # 切换到指定标签页
+        await context.switch_to_tab(tab_id)
+        self._last_screenshot_hash = None
+        # 返回成功结果
+        return ToolResult(output=f"Switched to tab {tab_id}")
+
+    # 打开新的标签页
+    async def _do_new_tab(self, context: "BrowserContext", *, url: str, **_) -> ToolResult:
+        # 打开新标签页
+        await context.create_new_tab(url)
+        # 返回成功结果
+        return ToolResult(output=f"Opened new tab with URL {url}")
+
+    # 关闭当前标签页
+    async def _do_close_tab(self, context: "BrowserContext", **_) -> ToolResult:
+        await context.close_current_tab()
+        # 返回成功结果
+        return _TAB_CLOSED
+
+    # 刷新当前页面
+    async def _do_refresh(self, context: "BrowserContext", **_) -> ToolResult:
+        await context.refresh_page()
+        self._last_screenshot_hash = None
+        # 返回成功结果
+        return _PAGE_REFRESHED
+
+    # 操作名到处理函数的映射表，O(1) 分发
+    _ACTIONS: ClassVar[Dict[str, Callable[..., Awaitable[ToolResult]]]] = {
+        "navigate": _do_navigate,
+        "click": _do_click,
+        "input_text": _do_input_text,
+        "screenshot": _do_screenshot,
+        "get_html": _do_get_html,
+        "get_text": _do_get_text,
+        "read_links": _do_read_links,
+        "execute_js": _do_execute_js,
+        "scroll": _do_scroll,
+        "switch_tab": _do_switch_tab,
+        "new_tab": _do_new_tab,
+        "close_tab": _do_close_tab,
+        "refresh": _do_refresh,
+    }
+
     async def get_current_state(self) -> ToolResult:
         """获取当前浏览器状态作为ToolResult"""
         # 使用异步锁确保线程安全
@@ -329,44 +575,39 @@ class BrowserUseTool(BaseTool):
             try:
                 # 确保浏览器和上下文已初始化
                 context = await self._ensure_browser_initialized()
-                # 获取浏览器状态
-                state = await context.get_state()
-                # 构建状态信息字典
-                state_info = {
-                    "url": state.url,
-                    "title": state.title,
-                    "tabs": [tab.model_dump() for tab in state.tabs],
-                    "interactive_elements": state.element_tree.clickable_elements_to_string(),
-                }
+                # 获取浏览器状态信息
+                state_info = await self._get_state_info(context)
                 # 返回成功结果，包含状态信息的JSON字符串
-                return ToolResult(output=json.dumps(state_info))
+                return ToolResult(output=_dumps(state_info))
             # 捕获异常并返回错误结果
             except Exception as e:
                 return ToolResult(error=f"Failed to get browser state: {str(e)}")
     
+    async def _get_state_info(self, context: "BrowserContext") -> dict:
+        """获取浏览器状态并构建状态信息字典，调用方需已持有锁"""
+        # 获取浏览器状态
+        state = await context.get_state()
+        tabs = state.tabs
+        return {
+            "url": state.url,
+            "title": state.title,
+            "tabs": _list_adapter(type(tabs[0])).dump_python(tabs) if tabs else [],
+            "interactive_elements": state.element_tree.clickable_elements_to_string(),
+        }
+
     async def cleanup(self):
         """清理浏览器资源的异步方法"""
          # 使用异步锁确保线程安全
         async with self.lock:
-            # 如果上下文对象存在，关闭上下文并清空相关对象
+            # 如果上下文对象存在，交给浏览器池关闭并清空相关对象
             if self.context is not None:
-                await self.context.close()
+                await _BrowserPool.release_context(self.context)
                 self.context = None
                 self.dom_service = None
-            # 如果浏览器对象存在，关闭浏览器并清空对象
-            if self.browser is not None:
-                await self.browser.close()
-                self.browser = None
-
-    def __del__(self):
-        """对象销毁时的析构函数，确保资源清理"""
-         # 如果浏览器或上下文对象存在
-        if self.browser is not None or self.context is not None:
-            # 尝试运行清理方法
-            try:
-                asyncio.run(self.cleanup())
-            # 如果当前事件循环不可用，创建新的事件循环并运行清理方法
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                loop.run_until_complete(self.cleanup())
-                loop.close()
+            # 共享浏览器由浏览器池持有，进程退出前由 close_shared_browser 关闭，这里只解除引用
+            self.browser = None
+
+    @staticmethod
+    async def close_shared_browser() -> None:
+        """关闭所有工具实例共享的浏览器，在进程退出前、各工具清理之后调用一次"""
+        await _BrowserPool.close()
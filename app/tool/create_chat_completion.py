@@ -1,8 +1,147 @@
-from typing import Any, List, Optional, Type, Union, get_args, get_origin
+import copy
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Any,
+    ClassVar,
+    List,
+    Mapping,
+    Optional,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
 
 from pydantic import BaseModel, Field
 
-from app.tool import BaseTool
+from app.tool.base import BaseTool
+
+# 用于JSON模式的类型映射字典，将 Python 类型映射到 JSON 类型（只读）
+_TYPE_MAPPING: Mapping[type, str] = MappingProxyType(
+    {
+        str: "string",
+        int: "integer",
+        float: "number",
+        bool: "boolean",
+        dict: "object",
+        list: "array",
+    }
+)
+
+# 默认必需字段
+DEFAULT_REQUIRED = ("response",)
+
+
+# 参数模式只取决于响应类型，按类型缓存，避免每次实例化都重新生成 JSON 模式
+@lru_cache(maxsize=128)
+def _build_parameters_cached(response_type: Optional[Type]) -> dict:
+    """构建参数模式的方法，根据响应类型构建参数模式"""
+    # 如果响应类型是字符串，应交付给用户的响应字符串
+    if response_type == str:
+        return {
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": "string",
+                    "description": "The response text that should be delivered to the user.",
+                },
+            },
+            "required": list(DEFAULT_REQUIRED),
+        }
+
+    # 如果响应类型是一个类且是 BaseModel 的子类
+    if isinstance(response_type, type) and issubclass(response_type, BaseModel):
+        schema = response_type.model_json_schema()
+        return {
+            "type": "object",
+            "properties": schema["properties"],
+            "required": schema.get("required", list(DEFAULT_REQUIRED)),
+        }
+
+    # 如果不是上述两种情况，调用_create_type_schema方法创建类型模式
+    return _create_type_schema(response_type)
+
+
+@lru_cache(maxsize=128)
+def _create_type_schema(type_hint: Type) -> dict:
+    """创建给定类型的JSON模式的方法"""
+    # 获取类型提示的原始类型
+    origin = get_origin(type_hint)
+    # 获取类型提示的参数
+    args = get_args(type_hint)
+
+    # 如果原始类型为 None，说明是基本类型
+    if origin is None:
+        return {
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": _TYPE_MAPPING.get(type_hint, "string"),
+                    "description": f"Response of type {type_hint.__name__}",
+                }
+            },
+            "required": list(DEFAULT_REQUIRED),
+        }
+
+    # 如果原始类型是list
+    if origin is list:
+        item_type = args[0] if args else Any
+        return {
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": "array",
+                    "items": _get_type_info(item_type),
+                }
+            },
+            "required": list(DEFAULT_REQUIRED),
+        }
+
+    # 如果原始类型是dict
+    if origin is dict:
+        value_type = args[1] if len(args) > 1 else Any
+        return {
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": "object",
+                    "additionalProperties": _get_type_info(value_type),
+                }
+            },
+            "required": list(DEFAULT_REQUIRED),
+        }
+
+    # 如果原始类型是Union
+    if origin is Union:
+        return _create_union_schema(args)
+
+    # 如果都不匹配，递归调用_build_parameters方法
+    return _build_parameters_cached(type_hint)
+
+
+# 递归模式中同一子类型会被反复解析，单独缓存
+@lru_cache(maxsize=256)
+def _get_type_info(type_hint: Type) -> dict:
+    """获取单个类型的类型信息。"""
+    # 如果类型提示是一个类且是BaseModel的子类
+    if isinstance(type_hint, type) and issubclass(type_hint, BaseModel):
+        return type_hint.model_json_schema()
+
+    return {
+        "type": _TYPE_MAPPING.get(type_hint, "string"),
+        "description": f"Value of type {getattr(type_hint, '__name__', 'any')}",
+    }
+
+
+def _create_union_schema(types: tuple) -> dict:
+    """创建Union类型模式的方法"""
+    return {
+        "type": "object",
+        "properties": {"response": {"anyOf": [_get_type_info(t) for t in types]}},
+        "required": list(DEFAULT_REQUIRED),
+    }
+
 
 # 定义 CreateChatCompletion 的类，继承自BaseTool
 class CreateChatCompletion(BaseTool):
@@ -12,22 +151,17 @@ class CreateChatCompletion(BaseTool):
     description: str = (
         "Creates a structured completion with specified output formatting."
     )
+    # 无状态工具，相同 response_type 的实例可共享
+    stateless: ClassVar[bool] = True
 
     # 用于JSON模式的类型映射字典，将 Python 类型映射到 JSON 类型
-    type_mapping: dict = {
-        str: "string",
-        int: "integer",
-        float: "number",
-        bool: "boolean",
-        dict: "object",
-        list: "array",
-    }
-    
+    type_mapping: ClassVar[Mapping[type, str]] = _TYPE_MAPPING
+
     # 响应类型，初始为None
     response_type: Optional[Type] = None
 
     # 必需的字段列表，默认必须包含'response'
-    required: List[str] = Field(default_factory=lambda: ["response"])
+    required: List[str] = Field(default_factory=lambda: list(DEFAULT_REQUIRED))
 
     def __init__(self, response_type: Optional[Type] = str):
         """使用特定的响应类型初始化。"""
@@ -39,110 +173,8 @@ class CreateChatCompletion(BaseTool):
         self.parameters = self._build_parameters()
 
     def _build_parameters(self) -> dict:
-        """构建参数模式的方法，根据响应类型构建参数模式"""
-        # 如果响应类型是字符串，应交付给用户的响应字符串
-        if self.response_type == str:
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": "string",
-                        "description": "The response text that should be delivered to the user.",
-                    },
-                },
-                "required": self.required,
-            }
-        
-        # 如果响应类型是一个类且是 BaseModel 的子类
-        if isinstance(self.response_type, type) and issubclass(
-            self.response_type, BaseModel
-        ):
-            schema = self.response_type.model_json_schema()
-            return {
-                "type": "object",
-                "properties": schema["properties"],
-                "required": schema.get("required", self.required),
-            }
-        
-        # 如果不是上述两种情况，调用_create_type_schema方法创建类型模式
-        return self._create_type_schema(self.response_type)
-
-    def _create_type_schema(self, type_hint: Type) -> dict:
-        """创建给定类型的JSON模式的方法"""
-        # 获取类型提示的原始类型
-        origin = get_origin(type_hint)
-        # 获取类型提示的参数
-        args = get_args(type_hint)
-
-
-        # 如果原始类型为 None，说明是基本类型
-        if origin is None:
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": self.type_mapping.get(type_hint, "string"),
-                        "description": f"Response of type {type_hint.__name__}",
-                    }
-                },
-                "required": self.required,
-            }
-
-        # 如果原始类型是list
-        if origin is list:
-            item_type = args[0] if args else Any
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": "array",
-                        "items": self._get_type_info(item_type),
-                    }
-                },
-                "required": self.required,
-            }
-
-        # 如果原始类型是dict
-        if origin is dict:
-            value_type = args[1] if len(args) > 1 else Any
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": "object",
-                        "additionalProperties": self._get_type_info(value_type),
-                    }
-                },
-                "required": self.required,
-            }
-
-        # 如果原始类型是Union
-        if origin is Union:
-            return self._create_union_schema(args)
-        
-        # 如果都不匹配，递归调用_build_parameters方法
-        return self._build_parameters()
-
-    def _get_type_info(self, type_hint: Type) -> dict:
-        """获取单个类型的类型信息。"""
-        # 如果类型提示是一个类且是BaseModel的子类
-        if isinstance(type_hint, type) and issubclass(type_hint, BaseModel):
-            return type_hint.model_json_schema()
-
-        return {
-            "type": self.type_mapping.get(type_hint, "string"),
-            "description": f"Value of type {getattr(type_hint, '__name__', 'any')}",
-        }
-    
-    def _create_union_schema(self, types: tuple) -> dict:
-        """创建Union类型模式的方法"""
-        return {
-            "type": "object",
-            "properties": {
-                "response": {"anyOf": [self._get_type_info(t) for t in types]}
-            },
-            "required": self.required,
-        }
+        """构建参数模式，返回缓存结果的深拷贝，避免调用方修改共享的模式"""
+        return copy.deepcopy(_build_parameters_cached(self.response_type))
 
     # 
     async def execute(self, required: list | None = None, **kwargs) -> Any:
@@ -156,6 +188,10 @@ class CreateChatCompletion(BaseTool):
         """
         
         
+        # 快速路径：字符串响应且未覆盖 required 时，直接取唯一的必需字段
+        if not required and self.response_type is str and len(self.required) == 1:
+            return kwargs.get(self.required[0], "")
+
         # 如果required为None，使用类的默认required字段
         required = required or self.required
 
@@ -172,7 +208,7 @@ class CreateChatCompletion(BaseTool):
             result = kwargs.get(required_field, "")
 
         # 类型转换逻辑
-        if self.response_type == str:
+        if self.response_type is str:
             return result
         
         # 如果响应类型是一个类且是BaseModel的子类
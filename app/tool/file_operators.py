@@ -1,8 +1,14 @@
 """File operation interfaces and implementations for local and sandbox environments."""
 
 import asyncio
+import contextlib
+import os
+import shlex
+import shutil
+import stat as stat_module
+import tempfile
 from pathlib import Path
-from typing import Optional, Protocol, Tuple, Union, runtime_checkable
+from typing import List, NamedTuple, Optional, Protocol, Tuple, Union, runtime_checkable
 
 from app.config import SandboxConfig
 from app.exceptions import ToolError
@@ -11,6 +17,18 @@ from app.sandbox.client import SANDBOX_CLIENT
 
 PathLike = Union[str, Path]
 
+# Buffer size for local file reads and writes, so large files take few syscalls
+_FILE_BUFFER_SIZE: int = 1 << 20
+
+
+class FileStat(NamedTuple):
+    """What one stat call reports about a path."""
+
+    is_dir: bool
+    size: int
+    # None when the operator cannot report a precise modification time
+    mtime_ns: Optional[int] = None
+
 
 @runtime_checkable
 class FileOperator(Protocol):
@@ -20,6 +38,19 @@ class FileOperator(Protocol):
         """Read content from a file."""
         ...
 
+    async def read_file_head(self, path: PathLike, max_chars: int) -> str:
+        """Read at most max_chars characters from the start of a file."""
+        ...
+
+    async def read_file_lines(
+        self, path: PathLike, start: int, end: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """Read lines [start, end) of a file and its total line count.
+
+        Lines and the count follow ``content.split("\\n")`` semantics.
+        """
+        ...
+
     async def write_file(self, path: PathLike, content: str) -> None:
         """Write content to a file."""
         ...
@@ -32,6 +63,24 @@ class FileOperator(Protocol):
         """Check if path exists."""
         ...
 
+    async def stat(self, path: PathLike) -> Optional[FileStat]:
+        """Stat a path in one call, returning None if it does not exist."""
+        ...
+
+    async def write_and_stat(
+        self, path: PathLike, content: str
+    ) -> Optional[FileStat]:
+        """Write content to a file and return its new stat if that is cheap."""
+        ...
+
+    async def list_dir(self, path: PathLike, max_depth: int = 2) -> Tuple[str, str]:
+        """List non-hidden paths up to max_depth levels below path.
+
+        Returns (listing, errors), where the listing has one path per line in
+        the format of ``find path -maxdepth N -not -path '*/\\.*'``.
+        """
+        ...
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
@@ -45,17 +94,95 @@ class LocalFileOperator(FileOperator):
     async def read_file(self, path: PathLike) -> str:
         """Read content from a local file."""
         try:
-            return Path(path).read_text()
+            return await asyncio.to_thread(self._read_text, path)
+        except Exception as e:
+            raise ToolError(f"Failed to read {path}: {str(e)}") from None
+
+    async def read_file_head(self, path: PathLike, max_chars: int) -> str:
+        """Read at most max_chars characters from the start of a local file."""
+        try:
+            return await asyncio.to_thread(self._read_text, path, max_chars)
+        except Exception as e:
+            raise ToolError(f"Failed to read {path}: {str(e)}") from None
+
+    async def read_file_lines(
+        self, path: PathLike, start: int, end: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """Stream a local file, keeping only lines [start, end)."""
+        try:
+            return await asyncio.to_thread(self._read_lines, path, start, end)
         except Exception as e:
             raise ToolError(f"Failed to read {path}: {str(e)}") from None
 
     async def write_file(self, path: PathLike, content: str) -> None:
         """Write content to a local file."""
         try:
-            Path(path).write_text(content)
+            await asyncio.to_thread(self._write_text, path, content)
         except Exception as e:
             raise ToolError(f"Failed to write to {path}: {str(e)}") from None
 
+    # The blocking helpers below run in a worker thread so file I/O never
+    # stalls the event loop.
+
+    @staticmethod
+    def _read_text(path: PathLike, max_chars: int = -1) -> str:
+        with open(path, buffering=_FILE_BUFFER_SIZE) as f:
+            return f.read(max_chars)
+
+    @staticmethod
+    def _read_lines(
+        path: PathLike, start: int, end: Optional[int]
+    ) -> Tuple[List[str], int]:
+        lines: List[str] = []
+        n_lines = 0
+        # An empty file, or one ending in a newline, has a trailing empty line
+        trailing_empty = True
+        with open(path, buffering=_FILE_BUFFER_SIZE) as f:
+            for i, line in enumerate(f):
+                n_lines += 1
+                trailing_empty = line.endswith("\n")
+                if i >= start and (end is None or i < end):
+                    lines.append(line[:-1] if trailing_empty else line)
+        if trailing_empty:
+            if n_lines >= start and (end is None or n_lines < end):
+                lines.append("")
+            n_lines += 1
+        return lines, n_lines
+
+    @staticmethod
+    def _write_text(path: PathLike, content: str) -> None:
+        # Resolve symlinks so the link itself is never replaced by a regular file
+        target = os.path.realpath(path)
+        try:
+            st = os.stat(target)
+        except FileNotFoundError:
+            # A new file has no previous content to protect
+            with open(target, "w", buffering=_FILE_BUFFER_SIZE) as f:
+                f.write(content)
+            return
+
+        # Write a hidden temporary file next to the target and rename it into
+        # place, so a failed write never leaves a truncated file behind
+        directory, name = os.path.split(target)
+        fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+        try:
+            with open(fd, "w", buffering=_FILE_BUFFER_SIZE) as f:
+                # Keep the original owner where the platform has the notion (not Windows)
+                if hasattr(os, "fchown") and (st.st_uid, st.st_gid) != (
+                    os.getuid(),
+                    os.getgid(),
+                ):
+                    with contextlib.suppress(PermissionError):
+                        os.fchown(fd, st.st_uid, st.st_gid)
+                f.write(content)
+            # After any chown, which may clear setuid/setgid bits
+            shutil.copymode(target, tmp)
+            os.replace(tmp, target)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+
     async def is_directory(self, path: PathLike) -> bool:
         """Check if path points to a directory."""
         return Path(path).is_dir()
@@ -64,6 +191,50 @@ class LocalFileOperator(FileOperator):
         """Check if path exists."""
         return Path(path).exists()
 
+    async def stat(self, path: PathLike) -> Optional[FileStat]:
+        """Stat a local path."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return FileStat(stat_module.S_ISDIR(st.st_mode), st.st_size, st.st_mtime_ns)
+
+    async def write_and_stat(
+        self, path: PathLike, content: str
+    ) -> Optional[FileStat]:
+        """Write content to a local file and stat it."""
+        await self.write_file(path, content)
+        return await self.stat(path)
+
+    async def list_dir(self, path: PathLike, max_depth: int = 2) -> Tuple[str, str]:
+        """List a local directory in-process with os.scandir instead of find."""
+        root = str(path)
+        lines: List[str] = []
+        errors: List[str] = []
+
+        def walk(directory: str, depth: int) -> None:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        lines.append(entry.path)
+                        if depth < max_depth and entry.is_dir(follow_symlinks=False):
+                            walk(entry.path, depth + 1)
+            except OSError as e:
+                errors.append(f"Cannot list '{directory}': {e.strerror}")
+
+        # Like the find pattern, a hidden component anywhere in the path hides it
+        if "/." not in root:
+            lines.append(root)
+            if max_depth > 0:
+                # A wide tree can take a while to walk, so keep it off the event loop
+                await asyncio.to_thread(walk, root, 1)
+        return (
+            "".join(line + "\n" for line in lines),
+            "".join(error + "\n" for error in errors),
+        )
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
@@ -110,6 +281,21 @@ class SandboxFileOperator(FileOperator):
         except Exception as e:
             raise ToolError(f"Failed to read {path} in sandbox: {str(e)}") from None
 
+    async def read_file_head(self, path: PathLike, max_chars: int) -> str:
+        """Read the start of a file in sandbox.
+
+        The sandbox client only transfers whole files, so this reads the file
+        and slices it.
+        """
+        return (await self.read_file(path))[:max_chars]
+
+    async def read_file_lines(
+        self, path: PathLike, start: int, end: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """Read lines [start, end) of a file in sandbox."""
+        lines = (await self.read_file(path)).split("\n")
+        return lines[start:end], len(lines)
+
     async def write_file(self, path: PathLike, content: str) -> None:
         """Write content to a file in sandbox."""
         await self._ensure_sandbox_initialized()
@@ -122,7 +308,7 @@ class SandboxFileOperator(FileOperator):
         """Check if path points to a directory in sandbox."""
         await self._ensure_sandbox_initialized()
         result = await self.sandbox_client.run_command(
-            f"test -d {path} && echo 'true' || echo 'false'"
+            f"test -d {shlex.quote(str(path))} && echo 'true' || echo 'false'"
         )
         return result.strip() == "true"
 
@@ -130,10 +316,39 @@ class SandboxFileOperator(FileOperator):
         """Check if path exists in sandbox."""
         await self._ensure_sandbox_initialized()
         result = await self.sandbox_client.run_command(
-            f"test -e {path} && echo 'true' || echo 'false'"
+            f"test -e {shlex.quote(str(path))} && echo 'true' || echo 'false'"
         )
         return result.strip() == "true"
 
+    async def stat(self, path: PathLike) -> Optional[FileStat]:
+        """Stat a path in sandbox with a single command.
+
+        The modification time is left out: ``stat`` only reports whole seconds
+        portably, which is too coarse to validate cached file contents.
+        """
+        await self._ensure_sandbox_initialized()
+        result = await self.sandbox_client.run_command(
+            f"stat -L -c '%F %s' {shlex.quote(str(path))} 2>/dev/null || echo missing"
+        )
+        kind, _, size = result.strip().rpartition(" ")
+        if not kind or not size.isdigit():
+            return None
+        return FileStat(kind == "directory", int(size))
+
+    async def write_and_stat(
+        self, path: PathLike, content: str
+    ) -> Optional[FileStat]:
+        """Write content to a file in sandbox without an extra stat round trip."""
+        await self.write_file(path, content)
+        return None
+
+    async def list_dir(self, path: PathLike, max_depth: int = 2) -> Tuple[str, str]:
+        """List a directory in sandbox with a single find command."""
+        _, stdout, stderr = await self.run_command(
+            f"find {shlex.quote(str(path))} -maxdepth {max_depth} -not -path '*/\\.*'"
+        )
+        return stdout, stderr
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
@@ -2,9 +2,13 @@ import asyncio
 import os
 
 import aiofiles
+import aiofiles.os
 
 from app.tool.base import BaseTool
 
+# 单次写入的最大字节数
+WRITE_CHUNK_SIZE = 1 << 20
+
 # 定义 FileSaver 的类，继承 BaseTool
 class FileSaver(BaseTool):
     # 名称
@@ -59,15 +63,19 @@ class FileSaver(BaseTool):
         try:
             # # 获取文件路径中的目录部分
             directory = os.path.dirname(file_path)
-            
-            # 如果目录不存在，则创建该目录（包括所有必要的父目录）
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory)
 
-            # 使用异步文件操作，以指定模式和UTF - 8编码打开文件
-            async with aiofiles.open(file_path, mode, encoding="utf-8") as file:
-                # 异步地将内容写入文件
-                await file.write(content)
+            # 在线程中创建目录（包括所有必要的父目录），已存在时不报错，避免先检查再创建的竞态
+            if directory:
+                await aiofiles.os.makedirs(directory, exist_ok=True)
+
+            # 预先编码为 UTF-8，以二进制模式一次性写入，避免逐次写入时重复编码
+            data = content.encode("utf-8")
+            async with aiofiles.open(file_path, mode + "b") as file:
+                # 异步地将内容写入文件；大内容按块写入，每次只占用线程池线程一小段时间，
+                # 通过 memoryview 切片避免复制子串
+                view = memoryview(data)
+                for start in range(0, len(view), WRITE_CHUNK_SIZE):
+                    await file.write(view[start : start + WRITE_CHUNK_SIZE])
 
             # 返回保存成功的消息
             return f"Content successfully saved to {file_path}"
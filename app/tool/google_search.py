@@ -1,12 +1,45 @@
 # 导入asyncio库，用于支持异步编程
 import asyncio
+import contextlib
+import time
+from collections import OrderedDict
 # 从typing模块导入List，用于类型提示，表示列表类型
-from typing import List
-# 从googlesearch库导入search函数，用于执行谷歌搜索
-from googlesearch import search
+from typing import ClassVar, List, Optional, Tuple
+# 从urllib.parse导入unquote，用于解码结果链接
+from urllib.parse import unquote
+
+# 导入aiohttp，使用长连接会话执行原生异步HTTP请求
+import aiohttp
+from pydantic import PrivateAttr
+# 从bs4导入BeautifulSoup，用于解析搜索结果页面
+from bs4 import BeautifulSoup
+# 从googlesearch库导入随机User-Agent生成函数
+from googlesearch.user_agents import get_useragent
+
 # 从app.tool.base模块导入BaseTool类，这可能是所有工具类的基类
 from app.tool.base import BaseTool
 
+# 谷歌搜索地址
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+# 绕过同意页面的cookies
+_CONSENT_COOKIES = {"CONSENT": "PENDING+987", "SOCS": "CAESHAgBEhIaAB"}
+# 搜索结果缓存的最大条目数
+SEARCH_CACHE_SIZE = 64
+# 搜索结果缓存的有效期（秒）
+SEARCH_CACHE_TTL = 600
+
+
+def _parse_links(html: str) -> List[str]:
+    """从搜索结果页面中解析出结果链接"""
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
+    for result in soup.find_all("div", class_="ezO2md"):
+        link_tag = result.find("a", href=True)
+        if link_tag:
+            links.append(unquote(link_tag["href"].split("&")[0].replace("/url?q=", "")))
+    return links
+
+
 # 定义GoogleSearch类，继承自BaseTool类
 class GoogleSearch(BaseTool):
     # 名称
@@ -38,6 +71,46 @@ The tool returns a list of URLs that match the search query.
         "required": ["query"],
     }
 
+    # 所有实例共享的HTTP会话，复用TCP/TLS连接
+    _session: ClassVar[Optional[aiohttp.ClientSession]] = None
+    # 共享会话所属的事件循环
+    _session_loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    # 请求超时时间（秒）
+    timeout: float = 5
+
+    # 搜索结果的LRU缓存，键为 (query, num_results)，值为 (写入时间, 链接列表)
+    _cache: "OrderedDict[Tuple[str, int], Tuple[float, List[str]]]" = PrivateAttr(
+        default_factory=OrderedDict
+    )
+
+    @classmethod
+    async def _get_session(cls) -> aiohttp.ClientSession:
+        """延迟创建共享会话，会话关闭或所属事件循环变化时重新创建"""
+        session = cls._session
+        loop = asyncio.get_running_loop()
+        if session is None or session.closed or cls._session_loop is not loop:
+            if session is not None and not session.closed:
+                # 旧会话属于另一个（通常已关闭的）事件循环，先关闭以释放其连接器；
+                # 其连接已无法正常断开，关闭时的错误可以忽略
+                with contextlib.suppress(Exception):
+                    await session.close()
+            cls._session_loop = loop
+            session = cls._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=10, ttl_dns_cache=300, keepalive_timeout=30
+                ),
+                cookies=_CONSENT_COOKIES,
+            )
+        return session
+
+    @classmethod
+    async def close(cls) -> None:
+        """关闭所有实例共享的会话，在进程退出前调用一次"""
+        session = cls._session
+        cls._session = None
+        if session is not None and not session.closed:
+            await session.close()
+
     # 定义异步执行的 execute 方法 ，接收搜索查询字符串query和结果数量num_results（默认10），返回字符串列表
     async def execute(self, query: str, num_results: int = 10) -> List[str]:
         """
@@ -49,15 +122,47 @@ The tool returns a list of URLs that match the search query.
         Returns:
             List[str]: 匹配搜索查询的URL列表。
         """
+        # 命中未过期的缓存时直接返回，省去一次网络往返
+        key = (query, num_results)
+        cached = self._cache.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[0] < SEARCH_CACHE_TTL:
+                self._cache.move_to_end(key)
+                return list(cached[1])
+            del self._cache[key]
+
+        session = await self._get_session()
+        links: List[str] = []
+        start = 0
+
+        # 分页获取结果，直到数量足够或没有新结果
+        while len(links) < num_results:
+            async with session.get(
+                GOOGLE_SEARCH_URL,
+                headers={"User-Agent": get_useragent(), "Accept": "*/*"},
+                params={
+                    "q": query,
+                    "num": num_results - start + 2,  # 多取两条以减少请求次数
+                    "hl": "en",
+                    "start": start,
+                    "safe": "active",
+                },
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as resp:
+                resp.raise_for_status()
+                html = await resp.text()
+
+            # 解析页面是CPU密集操作，放到线程中执行以避免阻塞事件循环
+            page_links = await asyncio.to_thread(_parse_links, html)
+            if not page_links:
+                break
+            links.extend(page_links[: num_results - len(links)])
+            start += 10
 
-        # 获取当前的事件循环
-        loop = asyncio.get_event_loop()
-        # 在一个线程池中运行search函数，以避免阻塞事件循环
-        # 这里使用 lambda 表达式将 search 函数包装成一个可调用对象，
-        # 并传入查询和结果数量参数，等待线程池执行完毕并返回搜索结果链接列表
-        links = await loop.run_in_executor(
-            None, lambda: list(search(query, num_results=num_results))
-        )
+        # 写入缓存，超出容量时淘汰最久未使用的条目
+        self._cache[key] = (time.monotonic(), links)
+        if len(self._cache) > SEARCH_CACHE_SIZE:
+            self._cache.popitem(last=False)
 
         # 返回搜索得到的链接列表
-        return links
+        return list(links)
@@ -1,6 +1,16 @@
 # tool/planning.py
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Dict, List, Literal, Optional
 
+# numpy 为可选依赖，缺失时回退到纯 Python 统计
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+from pydantic import ConfigDict, Field
+
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolResult
 
@@ -11,6 +21,97 @@ The tool provides functionality for creating plans, updating plan steps, and tra
 """
 # 该工具提供了创建计划、更新计划步骤以及跟踪进度的功能。
 
+# 步骤的所有状态，计划中以它们在此元组中的下标存储
+_STEP_STATUSES = ("not_started", "in_progress", "completed", "blocked")
+# 状态名到下标的映射，也用于校验状态
+_STATUS_INDEX = {name: i for i, name in enumerate(_STEP_STATUSES)}
+# 各状态在计划展示中使用的符号，按状态下标排列
+_STATUS_SYMBOLS = ("[ ]", "[→]", "[✓]", "[!]")
+_NOT_STARTED, _IN_PROGRESS, _COMPLETED, _BLOCKED = range(len(_STEP_STATUSES))
+
+
+def _count_statuses(statuses: array) -> List[int]:
+    """统计状态数组中各状态的步骤数，按状态下标排列"""
+    if np is not None:
+        # 直接在数组缓冲区上做 bincount，整个统计在一次 C 循环中完成
+        counts = np.bincount(
+            np.frombuffer(statuses, dtype=np.uint8), minlength=len(_STEP_STATUSES)
+        )
+        return counts.tolist()
+    counts = [0] * len(_STEP_STATUSES)
+    for status in statuses:
+        counts[status] += 1
+    return counts
+
+
+@dataclass(slots=True)
+class Plan:
+    """一个计划：步骤文本、状态和说明按下标一一对应，状态以小整数存储在紧凑数组中"""
+
+    plan_id: str
+    title: str
+    steps: List[str]
+    # 每个步骤的状态下标
+    statuses: array = field(default_factory=lambda: array("B"))
+    # 每个步骤的附加说明
+    notes: List[str] = field(default_factory=list)
+    # 各状态的步骤数，按状态下标排列，随状态变化增量维护
+    counts: List[int] = field(default_factory=lambda: [0] * len(_STEP_STATUSES))
+
+    @classmethod
+    def new(cls, plan_id: str, title: str, steps: List[str]) -> "Plan":
+        """创建所有步骤均未开始的计划"""
+        counts = [0] * len(_STEP_STATUSES)
+        counts[_NOT_STARTED] = len(steps)
+        return cls(
+            plan_id=plan_id,
+            title=title,
+            steps=steps,
+            statuses=array("B", bytes(len(steps))),
+            notes=[""] * len(steps),
+            counts=counts,
+        )
+
+    def status(self, index: int) -> str:
+        """返回指定步骤的状态名"""
+        return _STEP_STATUSES[self.statuses[index]]
+
+    @property
+    def step_statuses(self) -> List[str]:
+        """所有步骤的状态名列表"""
+        return [_STEP_STATUSES[s] for s in self.statuses]
+
+    def status_counts(self) -> Dict[str, int]:
+        """以状态名为键返回各状态的步骤数"""
+        return dict(zip(_STEP_STATUSES, self.counts))
+
+    def set_status(self, index: int, status: str) -> None:
+        """设置指定步骤的状态，同时更新状态计数"""
+        new = _STATUS_INDEX[status]
+        old = self.statuses[index]
+        self.counts[old] -= 1
+        self.counts[new] += 1
+        self.statuses[index] = new
+
+    def replace_steps(self, steps: List[str]) -> None:
+        """替换全部步骤；按步骤文本保留原有的状态和说明，重复的步骤按出现顺序依次对应"""
+        previous: Dict[str, deque] = {}
+        for old in zip(self.steps, self.statuses, self.notes):
+            previous.setdefault(old[0], deque()).append(old[1:])
+
+        statuses = array("B")
+        notes = []
+        for step in steps:
+            matches = previous.get(step)
+            status, note = matches.popleft() if matches else (_NOT_STARTED, "")
+            statuses.append(status)
+            notes.append(note)
+
+        self.steps = steps
+        self.statuses = statuses
+        self.notes = notes
+        self.counts = _count_statuses(statuses)
+
 class PlanningTool(BaseTool):
     """
     一个规划工具，允许代理为解决复杂任务创建和管理计划。
@@ -84,11 +185,14 @@ class PlanningTool(BaseTool):
         "additionalProperties": False,
     }
 
-    # 用于存储计划的字典，键为 plan_id，值为计划的详细信息
-    plans: dict = {}  # 
+    # 用于存储计划的字典，键为 plan_id，值为计划的详细信息；每个实例各自新建
+    plans: Dict[str, Plan] = Field(default_factory=dict)
     # 用于跟踪当前活动计划的ID，初始为None
     _current_plan_id: Optional[str] = None 
 
+    # Plan 中的状态数组为 array.array，需要允许任意类型
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     # 执行方法
     async def execute(
         self,
@@ -170,13 +274,7 @@ class PlanningTool(BaseTool):
             )
 
         # 创建一个新计划，初始化步骤状态和说明
-        plan = {
-            "plan_id": plan_id,
-            "title": title,
-            "steps": steps,
-            "step_statuses": ["not_started"] * len(steps),
-            "step_notes": [""] * len(steps),
-        }
+        plan = Plan.new(plan_id, title, steps)
 
         # 将新计划添加到plans字典中
         self.plans[plan_id] = plan
@@ -196,16 +294,14 @@ class PlanningTool(BaseTool):
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: update")
 
-        # 检查plan_id是否存在，不存在则抛出异常
-        if plan_id not in self.plans:
+        # 获取计划，不存在则抛出异常
+        plan = self.plans.get(plan_id)
+        if plan is None:
             raise ToolError(f"No plan found with ID: {plan_id}")
 
-        # 获取 ID
-        plan = self.plans[plan_id]
-
         # 如果提供了title，则更新计划的标题
         if title:
-            plan["title"] = title
+            plan.title = title
 
         # 如果提供了steps，则更新计划的步骤
         if steps:
@@ -216,27 +312,9 @@ class PlanningTool(BaseTool):
                     "Parameter `steps` must be a list of strings for command: update"
                 )
 
-            # 保留未更改步骤的现有状态
-            old_steps = plan["steps"]
-            old_statuses = plan["step_statuses"]
-            old_notes = plan["step_notes"]
-
-            # 创建新的步骤状态和说明列表
-            new_statuses = []
-            new_notes = []
-
-            for i, step in enumerate(steps):
-                # 如果步骤在旧步骤中位置相同，则保留原状态和说明
-                if i < len(old_steps) and step == old_steps[i]:
-                    new_statuses.append(old_statuses[i])
-                    new_notes.append(old_notes[i])
-                else:
-                    new_statuses.append("not_started")
-                    new_notes.append("")
-
-            plan["steps"] = steps
-            plan["step_statuses"] = new_statuses
-            plan["step_notes"] = new_notes
+            # 步骤与原来完全相同时无需重建任何列表
+            if steps != plan.steps:
+                plan.replace_steps(steps)
 
         return ToolResult(
             output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
@@ -251,22 +329,21 @@ class PlanningTool(BaseTool):
                 output="No plans available. Create a plan with the 'create' command."
             )
 
-        output = "Available plans:\n"
+        # 收集各行后一次性拼接，避免循环中反复复制字符串
+        parts = ["Available plans:\n"]
         for plan_id, plan in self.plans.items():
             # 标记当前活动计划
             current_marker = " (active)" if plan_id == self._current_plan_id else ""
             # 计算已完成的步骤数
-            completed = sum(
-                1 for status in plan["step_statuses"] if status == "completed"
-            )
+            completed = plan.counts[_COMPLETED]
             # 计划总数
-            total = len(plan["steps"])
+            total = len(plan.steps)
             # 进度
             progress = f"{completed}/{total} steps completed"
             # 当前执行情况
-            output += f"• {plan_id}{current_marker}: {plan['title']} - {progress}\n"
+            parts.append(f"• {plan_id}{current_marker}: {plan.title} - {progress}\n")
 
-        return ToolResult(output=output)
+        return ToolResult(output="".join(parts))
 
     def _get_plan(self, plan_id: Optional[str]) -> ToolResult:
         """获取特定计划的详细信息。"""
@@ -278,11 +355,11 @@ class PlanningTool(BaseTool):
                 )
             plan_id = self._current_plan_id
 
-        # 检查plan_id是否存在，不存在则抛出异常
-        if plan_id not in self.plans:
+        # 获取计划，不存在则抛出异常
+        plan = self.plans.get(plan_id)
+        if plan is None:
             raise ToolError(f"No plan found with ID: {plan_id}")
 
-        plan = self.plans[plan_id]
         return ToolResult(output=self._format_plan(plan))
 
     def _set_active_plan(self, plan_id: Optional[str]) -> ToolResult:
@@ -290,14 +367,15 @@ class PlanningTool(BaseTool):
         # 检查plan_id是否为空，为空则抛出异常
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: set_active")
-        # 检查plan_id是否存在，不存在则抛出异常
-        if plan_id not in self.plans:
+        # 获取计划，不存在则抛出异常
+        plan = self.plans.get(plan_id)
+        if plan is None:
             raise ToolError(f"No plan found with ID: {plan_id}")
 
         # 设置活动ID为传入ID
         self._current_plan_id = plan_id
         return ToolResult(
-            output=f"Plan '{plan_id}' is now the active plan.\n\n{self._format_plan(self.plans[plan_id])}"
+            output=f"Plan '{plan_id}' is now the active plan.\n\n{self._format_plan(plan)}"
         )
 
     def _mark_step(
@@ -316,38 +394,32 @@ class PlanningTool(BaseTool):
                 )
             plan_id = self._current_plan_id
 
-        # 检查plan_id是否存在，不存在则抛出异常
-        if plan_id not in self.plans:
+        # 获取计划，不存在则抛出异常
+        plan = self.plans.get(plan_id)
+        if plan is None:
             raise ToolError(f"No plan found with ID: {plan_id}")
 
         # 检查step_index是否为空，为空则抛出异常
         if step_index is None:
             raise ToolError("Parameter `step_index` is required for command: mark_step")
 
-        plan = self.plans[plan_id]
-
         # 检查step_index是否有效，无效则抛出异常
-        if step_index < 0 or step_index >= len(plan["steps"]):
+        if step_index < 0 or step_index >= len(plan.steps):
             raise ToolError(
-                f"Invalid step_index: {step_index}. Valid indices range from 0 to {len(plan['steps'])-1}."
+                f"Invalid step_index: {step_index}. Valid indices range from 0 to {len(plan.steps)-1}."
             )
 
         # 检查step_status是否有效，无效则抛出异常
-        if step_status and step_status not in [
-            "not_started",
-            "in_progress",
-            "completed",
-            "blocked",
-        ]:
+        if step_status and step_status not in _STATUS_INDEX:
             raise ToolError(
                 f"Invalid step_status: {step_status}. Valid statuses are: not_started, in_progress, completed, blocked"
             )
         # 如果提供了step_status，则更新步骤状态
         if step_status:
-            plan["step_statuses"][step_index] = step_status
+            plan.set_status(step_index, step_status)
         # 如果提供了step_notes，则更新步骤说明
         if step_notes:
-            plan["step_notes"][step_index] = step_notes
+            plan.notes[step_index] = step_notes
 
         return ToolResult(
             output=f"Step {step_index} updated in plan '{plan_id}'.\n\n{self._format_plan(plan)}"
@@ -359,11 +431,9 @@ class PlanningTool(BaseTool):
         # 检查plan_id是否为空，为空则抛出异常
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: delete")
-        # 检查plan_id是否存在，不存在则抛出异常
-        if plan_id not in self.plans:
+        # 从plans字典中删除计划，不存在则抛出异常
+        if self.plans.pop(plan_id, None) is None:
             raise ToolError(f"No plan found with ID: {plan_id}")
-        # 从plans字典中删除计划
-        del self.plans[plan_id]
 
         # 如果删除的是当前活动计划，则清除当前活动计划ID
         if self._current_plan_id == plan_id:
@@ -371,45 +441,37 @@ class PlanningTool(BaseTool):
 
         return ToolResult(output=f"Plan '{plan_id}' has been deleted.")
 
-    def _format_plan(self, plan: Dict) -> str:
+    def _format_plan(self, plan: Plan) -> str:
         """格式化计划以进行显示。"""
-        output = f"Plan: {plan['title']} (ID: {plan['plan_id']})\n"
-        output += "=" * len(output) + "\n\n"
+        # 收集各部分后一次性拼接，避免反复复制字符串
+        header = f"Plan: {plan.title} (ID: {plan.plan_id})\n"
+        parts = [header, "=" * len(header), "\n\n"]
 
         # 计算进度统计信息
-        total_steps = len(plan["steps"])
-        completed = sum(1 for status in plan["step_statuses"] if status == "completed")
-        in_progress = sum(
-            1 for status in plan["step_statuses"] if status == "in_progress"
-        )
-        blocked = sum(1 for status in plan["step_statuses"] if status == "blocked")
-        not_started = sum(
-            1 for status in plan["step_statuses"] if status == "not_started"
+        total_steps = len(plan.steps)
+        # 直接读取增量维护的状态计数
+        not_started, in_progress, completed, blocked = plan.counts
+
+        # 空计划时分母取 1，进度为 0.0%
+        parts.append(
+            f"Progress: {completed}/{total_steps} steps completed "
+            f"({completed / max(total_steps, 1):.1%})\n"
         )
 
-        output += f"Progress: {completed}/{total_steps} steps completed "
-        if total_steps > 0:
-            percentage = (completed / total_steps) * 100
-            output += f"({percentage:.1f}%)\n"
-        else:
-            output += "(0%)\n"
-
-        output += f"Status: {completed} completed, {in_progress} in progress, {blocked} blocked, {not_started} not started\n\n"
-        output += "Steps:\n"
+        parts.append(
+            f"Status: {completed} completed, {in_progress} in progress, {blocked} blocked, {not_started} not started\n\n"
+        )
+        parts.append("Steps:\n")
 
         # 添加每个步骤及其状态和说明
-        for i, (step, status, notes) in enumerate(
-            zip(plan["steps"], plan["step_statuses"], plan["step_notes"])
-        ):
-            status_symbol = {
-                "not_started": "[ ]",
-                "in_progress": "[→]",
-                "completed": "[✓]",
-                "blocked": "[!]",
-            }.get(status, "[ ]")
-
-            output += f"{i}. {status_symbol} {step}\n"
+        # 按下标遍历并把常用对象放入局部变量，省去 zip 元组和每步的全局查找
+        steps, statuses, step_notes = plan.steps, plan.statuses, plan.notes
+        symbols = _STATUS_SYMBOLS
+        append = parts.append
+        for i in range(total_steps):
+            append(f"{i}. {symbols[statuses[i]]} {steps[i]}\n")
+            notes = step_notes[i]
             if notes:
-                output += f"   Notes: {notes}\n"
+                append(f"   Notes: {notes}\n")
 
-        return output
+        return "".join(parts)
@@ -1,9 +1,146 @@
-import threading
-from typing import Dict
+import asyncio
+import atexit
+import builtins
+import marshal
+import multiprocessing
+import os
+from contextlib import redirect_stdout
+from functools import lru_cache
+from io import StringIO
+from multiprocessing.connection import Connection
+from types import CodeType
+from typing import Dict, List, Set
 
 from app.tool.base import BaseTool
 
 
+# 执行代码时使用的内置函数字典的模板，只构建一次，每次执行使用其副本
+_SAFE_BUILTINS = dict(vars(builtins))
+
+
+# 编译结果缓存的最大条目数
+_CODE_CACHE_SIZE = 256
+
+
+# 以源码字符串本身为键（而非其哈希值），避免哈希冲突时执行错误的代码；lru_cache 自带线程安全。
+# 工作进程只使用一次，缓存必须在父进程中才能命中，因此在父进程编译，把序列化的代码对象发给工作进程
+@lru_cache(maxsize=_CODE_CACHE_SIZE)
+def _compile(code: str) -> bytes:
+    """编译代码并以 marshal 格式缓存，重复提交相同代码时跳过编译"""
+    return marshal.dumps(compile(code, "<string>", "exec"))
+
+
+def _run_code(code: CodeType) -> Dict:
+    """执行代码并返回结果字典"""
+    result = {"observation": ""}
+    # 创建全局命名空间；内置函数字典每次复制一份，执行的代码修改它不会影响之后的执行
+    safe_globals = {"__builtins__": _SAFE_BUILTINS.copy()}
+    # 创建一个字符串缓冲区用于捕获输出
+    output_buffer = StringIO()
+    error = None
+    try:
+        # 将标准输出重定向到缓冲区，退出时（包括异常时）自动恢复
+        with redirect_stdout(output_buffer):
+            # 执行传入的代码，使用安全的全局命名空间和空的局部命名空间
+            exec(code, safe_globals, {})
+
+    # 捕获执行过程中的任何异常
+    except Exception as e:
+        error = e
+        # 设置 'success' 为 False，表示执行失败
+        result["success"] = False
+    finally:
+        # 将缓冲区中已捕获的输出赋值给 'observation'，出错时在其后附加异常信息
+        result["observation"] = output_buffer.getvalue() + (
+            str(error) if error is not None else ""
+        )
+    return result
+
+
+def _worker_main(conn: Connection) -> None:
+    """工作进程入口：接收一段编译好的代码、执行并发回结果后退出"""
+    try:
+        code = conn.recv_bytes()
+    except EOFError:
+        return
+    conn.send(_run_code(marshal.loads(code)))
+
+
+class _Worker:
+    """一个预先启动、只执行一次代码的子进程及其通信管道"""
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        # 不使用守护进程：守护进程不能创建子进程，执行的代码需要能启动自己的进程；
+        # 因此由 kill 显式终止并回收，解释器退出时由 _kill_live_workers 统一清理
+        self.process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn,)
+        )
+        self.process.start()
+        _live_workers.add(self)
+        # 父进程不使用子进程端，关闭后子进程异常退出时这一端能收到 EOF
+        child_conn.close()
+
+    def kill(self) -> None:
+        """终止子进程并回收资源"""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.conn.close()
+        _live_workers.discard(self)
+
+
+# 所有尚未回收的工作进程，包括预启动的和正在执行代码的
+_live_workers: Set[_Worker] = set()
+
+
+@atexit.register
+def _kill_live_workers() -> None:
+    """解释器退出时终止所有工作进程，否则 multiprocessing 会等待非守护子进程结束"""
+    for worker in list(_live_workers):
+        worker.kill()
+
+
+# 预先启动、尚未使用的工作进程，调用时无需等待进程创建。
+# 每个工作进程只执行一次代码，执行后即终止，因此对 sys.modules、工作目录、
+# 环境变量和模块状态的修改不会泄漏到之后的调用
+_idle_workers: List[_Worker] = []
+# 最多保留的预启动工作进程数
+_MAX_IDLE_WORKERS = max(2, (os.cpu_count() or 2) // 2)
+
+
+def _acquire_worker() -> _Worker:
+    """取一个存活的预启动工作进程，没有则新建；并补充一个预启动进程供下次调用"""
+    worker = None
+    while _idle_workers:
+        candidate = _idle_workers.pop()
+        if candidate.process.is_alive():
+            worker = candidate
+            break
+        candidate.kill()
+    if len(_idle_workers) < _MAX_IDLE_WORKERS:
+        _idle_workers.append(_Worker())
+    return worker or _Worker()
+
+
+async def _wait_readable(conn: Connection) -> None:
+    """等待管道可读（有结果或子进程已退出）"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    fd = conn.fileno()
+    try:
+        loop.add_reader(fd, lambda: future.done() or future.set_result(None))
+    except NotImplementedError:
+        # 不支持 add_reader 的事件循环（如 Windows 的 Proactor），退回到在线程中轮询
+        while not await asyncio.to_thread(conn.poll, 0.1):
+            pass
+        return
+    try:
+        await future
+    finally:
+        loop.remove_reader(fd)
+
+
 class PythonExecute(BaseTool):
     """一个用于执行受超时和安全限制约束的Python代码的工具。"""
     # 名字
@@ -42,50 +179,41 @@ class PythonExecute(BaseTool):
             Dict: 包含 'observation'，其值为执行输出或错误消息，以及 'success' 状态。
         """
         
-        result = {"observation": ""}
+        try:
+            compiled = _compile(code)
+        except Exception as e:
+            # 语法错误等编译错误，与执行时出错一样返回错误信息
+            return {"observation": str(e), "success": False}
 
-        # 定义 run_code 内部函数来实际执行代码
-        def run_code():
+        # 在预启动的工作进程中执行代码：超时后可以真正终止，标准输出也不会与其他调用互相干扰
+        worker = _acquire_worker()
+        try:
+            worker.conn.send_bytes(compiled)
+            # 由事件循环等待管道可读并控制超时，等待期间不阻塞事件循环也不占用线程
+            try:
+                await asyncio.wait_for(_wait_readable(worker.conn), timeout)
+            except asyncio.TimeoutError:
+                # 超时仍未返回结果，说明执行超时；终止该工作进程，下次调用会新建
+                worker.kill()
+                return {
+                    "observation": f"Execution timeout after {timeout} seconds",
+                    "success": False,
+                }
             try:
-                # 创建一个安全的全局命名空间，只包含必要的内置函数
-                safe_globals = {"__builtins__": dict(__builtins__)}
-
-                import sys
-                from io import StringIO
-
-                # 创建一个字符串缓冲区用于捕获输出
-                output_buffer = StringIO()
-                # 将标准输出重定向到缓冲区
-                sys.stdout = output_buffer
-
-                # 执行传入的代码，使用安全的全局命名空间和空的局部命名空间
-                exec(code, safe_globals, {})
-
-                # 恢复标准输出
-                sys.stdout = sys.__stdout__
-
-                # 将缓冲区中的输出内容赋值给结果字典的 'observation' 键
-                result["observation"] = output_buffer.getvalue()
-
-            # 捕获执行过程中的任何异常
-            except Exception as e:
-                # 将异常信息转换为字符串并赋值给 'observation' 键
-                result["observation"] = str(e)
-                # 设置 'success' 为 False，表示执行失败
-                result["success"] = False
-
-        # 创建一个线程来运行 run_code 函数
-        thread = threading.Thread(target=run_code)
-        # 启动线程
-        thread.start()
-        # 等待线程执行，设置超时时间
-        thread.join(timeout)
-
-        # 如果线程在超时后仍然存活，说明执行超时
-        if thread.is_alive():
-            return {
-                "observation": f"Execution timeout after {timeout} seconds",
-                "success": False,
-            }
-        # 返回结果字典
+                result = worker.conn.recv()
+            except EOFError:
+                # 工作进程未发送结果就退出了
+                worker.kill()
+                return {
+                    "observation": f"Execution process exited with code {worker.process.exitcode}",
+                    "success": False,
+                }
+        except BaseException:
+            # 被取消或通信出错时工作进程状态未知，直接终止
+            worker.kill()
+            raise
+
+        # 执行完成，工作进程不再复用
+        worker.kill()
+        # 返回工作进程发送的结果字典
         return result
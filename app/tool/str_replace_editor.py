@@ -1,12 +1,36 @@
 """File and directory manipulation tool with sandbox support."""
-from collections import defaultdict
-from typing import Any, DefaultDict, List, Literal, Optional, get_args
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+)
+
+# numpy 为可选依赖，缺失时回退到纯 Python 逐个查找换行符
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+from pydantic import PrivateAttr
+
 from app.config import config
 from app.exceptions import ToolError
-from app.tool import BaseTool
-from app.tool.base import CLIResult, ToolResult
+from app.tool.base import BaseTool, CLIResult, ToolResult
 from app.tool.file_operators import (
     FileOperator,
+    FileStat,
     LocalFileOperator,
     PathLike,
     SandboxFileOperator,
@@ -26,6 +50,20 @@ SNIPPET_LINES: int = 4
 # 定义常量MAX_RESPONSE_LEN，用于表示最大响应长度
 MAX_RESPONSE_LEN: int = 16000
 
+# 文件内容缓存最多保留的文件数
+CONTENT_CACHE_SIZE: int = 32
+# 按行范围查看时，不超过此大小（字节）的文件整体读取并缓存，以便随后的编辑命中缓存
+CACHE_READ_MAX_SIZE: int = 1024 * 1024
+
+# 一条编辑历史：反向补丁 (偏移量, 插入的文本, 被替换掉的文本)，
+# 或者文件的完整快照（用于 create）
+HistoryEntry = Union[Tuple[int, str, str], str]
+
+# 每个文件最多保留的编辑历史条数
+HISTORY_MAX_PER_PATH: int = 20
+# 所有文件的编辑历史合计最多保留的字符数
+HISTORY_MAX_TOTAL_CHARS: int = 64 * 1024 * 1024
+
 # 定义常量TRUNCATED_MESSAGE，用于表示截断响应时附加的提示信息,仅显示了文件部分内容，
 # <响应截断><注意>为了节省上下文，仅显示了此文件的部分内容。
 # 您应该在使用grep -n搜索文件后再重新尝试此工具，以便找到您要查找的行号。</注意>
@@ -77,6 +115,53 @@ def maybe_truncate(
         return content
     return content[:truncate_after] + TRUNCATED_MESSAGE
 
+def _index_lines(content: str) -> array:
+    """返回每一行起始位置的偏移量，第 i 个元素是第 i 行（从0开始）的起始偏移量。"""
+    offsets = array("q", [0])
+    if np is not None:
+        # 按字符编码成定长数组后一次性找出所有换行符，下标即字符偏移量
+        if content.isascii():
+            codes = np.frombuffer(content.encode("ascii"), dtype=np.uint8)
+        else:
+            codes = np.frombuffer(content.encode("utf-32-le"), dtype=np.uint32)
+        offsets.frombytes((np.flatnonzero(codes == 10) + 1).astype(np.int64).tobytes())
+        return offsets
+    find = content.find
+    pos = find("\n")
+    while pos >= 0:
+        offsets.append(pos + 1)
+        pos = find("\n", pos + 1)
+    return offsets
+
+@dataclass(slots=True)
+class _CachedFile:
+    """内容缓存中的一个文件：内容及由其派生、按需计算的数据。"""
+
+    mtime_ns: int
+    size: int
+    content: str
+    # 每一行起始位置的偏移量，首次使用时才计算
+    offsets: Optional[array] = None
+
+def _advance_lines(content: str, start: int, count: int) -> int:
+    """返回从 start 所在行起向后第 count 行的起始偏移量，行数不足时返回-1。"""
+    find = content.find
+    for _ in range(count):
+        start = find("\n", start) + 1
+        if not start:
+            return -1
+    return start
+
+def _history_size(entry: HistoryEntry) -> int:
+    """返回一条编辑历史占用的字符数。"""
+    if isinstance(entry, str):
+        return len(entry)
+    return len(entry[1]) + len(entry[2])
+
+def _expand_tabs(content: str) -> str:
+    """展开制表符；不含制表符时直接返回原字符串，避免复制。"""
+    return content.expandtabs() if "\t" in content else content
+
 # 定义StrReplaceEditor类，继承自BaseTool，
 class StrReplaceEditor(BaseTool):
     """一个带有沙箱支持的用于查看、创建和编辑文件的工具。"""
@@ -135,20 +220,237 @@ class StrReplaceEditor(BaseTool):
         "required": ["command", "path"],
     }
 
-    # 定义类属性_file_history，用于存储文件的历史内容，使用defaultdict创建默认值为列表的字典
-    _file_history: DefaultDict[PathLike, List[str]] = defaultdict(list)
-    _local_operator: LocalFileOperator = LocalFileOperator()
-    # todo: Sandbox resources need to be destroyed at the appropriate time.
-    _sandbox_operator: SandboxFileOperator = SandboxFileOperator()
+    # 每个实例各自的编辑历史，按最近编辑的顺序排列文件，超出容量时淘汰最久未编辑文件的最早历史
+    _file_history: "OrderedDict[PathLike, Deque[HistoryEntry]]" = PrivateAttr(
+        default_factory=OrderedDict
+    )
+    # 编辑历史当前合计的字符数
+    _history_chars: int = PrivateAttr(default=0)
+    # 当前运行模式使用的文件操作器，首次使用时才创建，由 cleanup 释放沙箱资源
+    _operator: Optional[FileOperator] = PrivateAttr(default=None)
+    # _operator 是否为沙箱文件操作器
+    _operator_is_sandbox: bool = PrivateAttr(default=False)
+    # 文件内容的LRU缓存，键为路径
+    _content_cache: "OrderedDict[str, _CachedFile]" = PrivateAttr(
+        default_factory=OrderedDict
+    )
 
     # def _get_operator(self, use_sandbox: bool) -> FileOperator:
     def _get_operator(self) -> FileOperator:
-        """Get the appropriate file operator based on execution mode."""
-        return (
-            self._sandbox_operator
-            if config.sandbox.use_sandbox
-            else self._local_operator
-        )
+        """Get the appropriate file operator based on execution mode.
+
+        Only the operator for the active mode is created, on first use.
+        """
+        use_sandbox = config.sandbox.use_sandbox
+        if self._operator is None or self._operator_is_sandbox != use_sandbox:
+            self._operator = (
+                SandboxFileOperator() if use_sandbox else LocalFileOperator()
+            )
+            self._operator_is_sandbox = use_sandbox
+        return self._operator
+
+    async def cleanup(self) -> None:
+        """清理沙箱资源"""
+        if isinstance(self._operator, SandboxFileOperator):
+            await self._operator.sandbox_client.cleanup()
+        self._operator = None
+
+    def _lookup_cache(
+        self, key: str, stat: Optional[FileStat]
+    ) -> Optional[_CachedFile]:
+        """返回与文件当前 mtime 和大小一致的缓存条目，没有时返回None。"""
+        cached = self._content_cache.get(key)
+        if (
+            cached is None
+            or stat is None
+            or cached.mtime_ns != stat.mtime_ns
+            or cached.size != stat.size
+        ):
+            return None
+        self._content_cache.move_to_end(key)
+        return cached
+
+    def _line_offsets(self, path: PathLike, content: str) -> array:
+        """返回 content 每一行的起始偏移量；content 就是缓存的内容时复用缓存的结果。"""
+        cached = self._content_cache.get(str(path))
+        if cached is None or cached.content is not content:
+            return _index_lines(content)
+        if cached.offsets is None:
+            cached.offsets = _index_lines(content)
+        return cached.offsets
+
+    async def _read_file(
+        self,
+        path: PathLike,
+        operator: FileOperator,
+        stat: Optional[FileStat] = None,
+    ) -> str:
+        """读取文件内容；文件的 mtime 和大小未变时直接返回缓存的内容。
+
+        stat 为本次调用中已经获取的文件状态，提供时不再重复获取。
+        """
+        key = str(path)
+        stat = stat or await operator.stat(path)
+        cached = self._lookup_cache(key, stat)
+        if cached is not None:
+            return cached.content
+        content = await operator.read_file(path)
+        self._cache_content(key, stat, content)
+        return content
+
+    async def _read_file_head(
+        self,
+        path: PathLike,
+        operator: FileOperator,
+        max_chars: int,
+        stat: Optional[FileStat] = None,
+    ) -> str:
+        """读取文件开头至多 max_chars 个字符；缓存命中时返回完整内容，由调用方截断。"""
+        key = str(path)
+        stat = stat or await operator.stat(path)
+        cached = self._lookup_cache(key, stat)
+        if cached is not None:
+            return cached.content
+        content = await operator.read_file_head(path, max_chars)
+        # 不足 max_chars 说明已读到文件末尾，可以作为完整内容缓存
+        if len(content) < max_chars:
+            self._cache_content(key, stat, content)
+        return content
+
+    async def _read_line_range(
+        self,
+        path: PathLike,
+        operator: FileOperator,
+        start: int,
+        end: Optional[int],
+        stat: Optional[FileStat] = None,
+    ) -> Tuple[str, int]:
+        """读取第 start 到 end 行（从0开始，不含end，None表示到文件末尾）并以换行连接，同时返回文件总行数。"""
+        key = str(path)
+        stat = stat or await operator.stat(path)
+        cached = self._lookup_cache(key, stat)
+        if cached is None:
+            if stat is None or stat.mtime_ns is None or stat.size > CACHE_READ_MAX_SIZE:
+                # 大文件或无法缓存的文件只读取请求范围内的行
+                lines, n_lines = await operator.read_file_lines(path, start, end)
+                return "\n".join(lines), n_lines
+            # 小文件整体读取并缓存，查看后紧接着的编辑无需再次读取
+            await self._read_file(path, operator, stat)
+            cached = self._content_cache[key]
+
+        # 缓存命中时用行偏移量直接切出这一段，无需分割整个文件
+        content = cached.content
+        offsets = self._line_offsets(path, content)
+        n_lines = len(offsets)
+        end = n_lines if end is None else min(end, n_lines)
+        if start >= end:
+            return "", n_lines
+        stop = offsets[end] - 1 if end < n_lines else len(content)
+        return content[offsets[start] : stop], n_lines
+
+    async def _write_file(
+        self, path: PathLike, content: str, operator: FileOperator
+    ) -> None:
+        """写入文件，并用新内容更新缓存而不是使其失效。"""
+        stat = await operator.write_and_stat(path, content)
+        self._cache_content(str(path), stat, content)
+
+    def _cache_content(
+        self, key: str, stat: Optional[FileStat], content: str
+    ) -> None:
+        """缓存文件内容，超出容量时淘汰最久未使用的条目；没有精确修改时间的文件不缓存。"""
+        if stat is None or stat.mtime_ns is None:
+            self._content_cache.pop(key, None)
+            return
+        self._content_cache[key] = _CachedFile(stat.mtime_ns, stat.size, content)
+        self._content_cache.move_to_end(key)
+        if len(self._content_cache) > CONTENT_CACHE_SIZE:
+            self._content_cache.popitem(last=False)
+
+    def _push_history(self, path: PathLike, entry: HistoryEntry) -> None:
+        """记录一条编辑历史，并按每个文件的条数和总字符数上限淘汰最早的历史。"""
+        history = self._file_history.get(path)
+        if history is None:
+            history = self._file_history[path] = deque()
+        else:
+            self._file_history.move_to_end(path)
+        history.append(entry)
+        self._history_chars += _history_size(entry)
+        if len(history) > HISTORY_MAX_PER_PATH:
+            self._history_chars -= _history_size(history.popleft())
+
+        # 从最久未编辑的文件开始淘汰，但保留刚记录的这一条
+        while self._history_chars > HISTORY_MAX_TOTAL_CHARS:
+            oldest_path, oldest = next(iter(self._file_history.items()))
+            if oldest is history and len(history) == 1:
+                break
+            self._history_chars -= _history_size(oldest.popleft())
+            if not oldest:
+                del self._file_history[oldest_path]
+
+    def _pop_history(self, path: PathLike, entry: HistoryEntry) -> None:
+        """移除 path 最后一条编辑历史 entry。"""
+        history = self._file_history[path]
+        history.pop()
+        self._history_chars -= _history_size(entry)
+        if not history:
+            del self._file_history[path]
+
+    # 以下为各命令的处理方法，参数已由 execute 验证路径后传入，未用到的参数由 **_ 忽略
+    async def _command_view(
+        self, path: str, operator: FileOperator, stat: Optional[FileStat], *,
+        view_range: Optional[List[int]] = None, **_: Any,
+    ) -> CLIResult:
+        return await self.view(path, view_range, operator, stat=stat)
+
+    async def _command_create(
+        self, path: str, operator: FileOperator, stat: Optional[FileStat], *,
+        file_text: Optional[str] = None, **_: Any,
+    ) -> ToolResult:
+        # 如果创建命令时没有提供文件内容，抛出工具错误
+        if file_text is None:
+            raise ToolError("Parameter `file_text` is required for command: create")
+        await self._write_file(path, file_text, operator)
+        self._push_history(path, file_text)
+        return ToolResult(output=f"File created successfully at: {path}")
+
+    async def _command_str_replace(
+        self, path: str, operator: FileOperator, stat: Optional[FileStat], *,
+        old_str: Optional[str] = None, new_str: Optional[str] = None, **_: Any,
+    ) -> CLIResult:
+        # 如果替换命令时没有提供旧字符串，抛出工具错误
+        if old_str is None:
+            raise ToolError("Parameter `old_str` is required for command: str_replace")
+        # 执行字符串替换操作
+        return await self.str_replace(path, old_str, new_str, operator, stat=stat)
+
+    async def _command_insert(
+        self, path: str, operator: FileOperator, stat: Optional[FileStat], *,
+        insert_line: Optional[int] = None, new_str: Optional[str] = None, **_: Any,
+    ) -> CLIResult:
+        # 如果插入命令时没有提供插入行号，抛出工具错误
+        if insert_line is None:
+            raise ToolError("Parameter `insert_line` is required for command: insert")
+        # 如果插入命令时没有提供新字符串，抛出工具错误
+        if new_str is None:
+            raise ToolError("Parameter `new_str` is required for command: insert")
+        # 执行插入操作
+        return await self.insert(path, insert_line, new_str, operator, stat=stat)
+
+    async def _command_undo_edit(
+        self, path: str, operator: FileOperator, stat: Optional[FileStat], **_: Any
+    ) -> CLIResult:
+        # 执行撤销编辑操作
+        return await self.undo_edit(path, operator, stat=stat)
+
+    # 命令到处理方法的映射，execute 通过一次字典查找分派命令
+    _COMMAND_HANDLERS: ClassVar[Dict[str, Callable[..., Awaitable[Any]]]] = {
+        "view": _command_view,
+        "create": _command_create,
+        "str_replace": _command_str_replace,
+        "insert": _command_insert,
+        "undo_edit": _command_undo_edit,
+    }
 
     # 定义execute方法，用于执行工具的具体操作，接受命令、路径等参数
     async def execute(
@@ -167,54 +469,39 @@ class StrReplaceEditor(BaseTool):
         # 获取适当的文件操作器
         operator = self._get_operator()
 
-        # 验证路径和命令组合
-        await self.validate_path(command, path, operator)
+        # 验证路径和命令组合，验证时获取的文件状态会传给后续操作以免重复获取
+        stat = await self.validate_path(command, path, operator)
 
-        # 根据不同的命令执行相应的操作
-        if command == "view":
-            result = await self.view(path, view_range, operator)
-        elif command == "create":
-            # 如果创建命令时没有提供文件内容，抛出工具错误 
-            if file_text is None:
-                raise ToolError("Parameter `file_text` is required for command: create")
-            await operator.write_file(path, file_text)
-            self._file_history[path].append(file_text)
-            result = ToolResult(output=f"File created successfully at: {path}")
-        elif command == "str_replace":
-            # 如果替换命令时没有提供旧字符串，抛出工具错误
-            if old_str is None:
-                raise ToolError(
-                    "Parameter `old_str` is required for command: str_replace"
-                )
-            # 执行字符串替换操作
-            result = await self.str_replace(path, old_str, new_str, operator)
-        elif command == "insert":
-            # 如果插入命令时没有提供插入行号，抛出工具错误
-            if insert_line is None:
-                raise ToolError(
-                    "Parameter `insert_line` is required for command: insert"
-                )
-             # 如果插入命令时没有提供新字符串，抛出工具错误
-            if new_str is None:
-                raise ToolError("Parameter `new_str` is required for command: insert")
-            # 执行插入操作
-            result = await self.insert(path, insert_line, new_str, operator)
-        elif command == "undo_edit":
-            # 执行撤销编辑操作
-            result = await self.undo_edit(path, operator)
-        else:
+        # 根据命令查找相应的处理方法
+        handler = self._COMMAND_HANDLERS.get(command)
+        if handler is None:
             # 如果命令不被识别，抛出工具错误，提示允许的命令
             raise ToolError(
                 f'Unrecognized command {command}. The allowed commands for the {self.name} tool are: {", ".join(get_args(Command))}'
             )
+        result = await handler(
+            self,
+            path,
+            operator,
+            stat,
+            file_text=file_text,
+            view_range=view_range,
+            old_str=old_str,
+            new_str=new_str,
+            insert_line=insert_line,
+        )
         # 返回操作结果的字符串表示
         return str(result)
-    
+
     # 定义validate_path方法，用于验证路径和命令的组合是否有效
     async def validate_path(
         self, command: str, path: str, operator: FileOperator
-    ) -> None:
-        """Validate path and command combination based on execution environment."""
+    ) -> Optional[FileStat]:
+        """Validate path and command combination based on execution environment.
+
+        Existence and type are checked with a single stat, which is returned so
+        callers can reuse it.
+        """
         # Check if path is absolute
         if not path.startswith("/"):
             suggested_path = f"/{path}"
@@ -222,36 +509,37 @@ class StrReplaceEditor(BaseTool):
                 f"The path {path} is not an absolute path, it should start with `/`. "
                 f"Maybe you meant {suggested_path}?"
             )
+        stat = await operator.stat(path)
         # Only check if path exists for non-create commands
         if command != "create":
-            if not await operator.exists(path):
+            if stat is None:
                 raise ToolError(
                     f"The path {path} does not exist. Please provide a valid path."
                 )
 
         # Check if path is a directory
-            is_dir = await operator.is_directory(path)
-            if is_dir and command != "view":
+            if stat.is_dir and command != "view":
                 raise ToolError(
                     f"The path {path} is a directory and only the `view` command can be used on directories"
                 )
         # Check if file exists for create command
         elif command == "create":
-            exists = await operator.exists(path)
-            if exists:
+            if stat is not None:
                 raise ToolError(
                     f"File already exists at: {path}. Cannot overwrite files using command `create`."
                 )
+        return stat
     # 定义view方法，实现查看命令的功能
     async def view(
         self,
         path: PathLike,
         view_range: Optional[List[int]] = None,
         operator: FileOperator = None,
+        stat: Optional[FileStat] = None,
     ) -> CLIResult:
         """Display file or directory content."""
         # Determine if path is a directory
-        is_dir = await operator.is_directory(path)
+        is_dir = stat.is_dir if stat else await operator.is_directory(path)
 
         if is_dir:
             # Directory handling
@@ -263,15 +551,13 @@ class StrReplaceEditor(BaseTool):
             return await self._view_directory(path, operator)
         else:
             # File handling
-            return await self._view_file(path, operator, view_range)
+            return await self._view_file(path, operator, view_range, stat)
 
     @staticmethod
     async def _view_directory(path: PathLike, operator: FileOperator) -> CLIResult:
         """Display directory contents."""
-        find_cmd = f"find {path} -maxdepth 2 -not -path '*/\\.*'"
-
-        # Execute command using the operator
-        returncode, stdout, stderr = await operator.run_command(find_cmd)
+        # List the directory using the operator
+        stdout, stderr = await operator.list_dir(path, max_depth=2)
 
         if not stderr:
             stdout = (
@@ -286,27 +572,32 @@ class StrReplaceEditor(BaseTool):
         path: PathLike,
         operator: FileOperator,
         view_range: Optional[List[int]] = None,
+        stat: Optional[FileStat] = None,
     ) -> CLIResult:
         """Display file content, optionally within a specified line range."""
-        # Read file content
-        file_content = await operator.read_file(path)
         # 初始化行号为1
         init_line = 1
 
         # 如果提供了view_range参数
         if view_range:
-            # 检查view_range参数格式是否正确，如果不正确，抛出工具错误
-            if len(view_range) != 2 or not all(isinstance(i, int) for i in view_range):
+            # 获取起始行号和结束行号，检查view_range参数格式是否正确，如果不正确，抛出工具错误
+            try:
+                init_line, final_line = view_range
+            except (TypeError, ValueError):
+                init_line = final_line = None
+            if not isinstance(init_line, int) or not isinstance(final_line, int):
                 raise ToolError(
                     "Invalid `view_range`. It should be a list of two integers."
                 )
-            
-            # 将文件内容按行分割
-            file_lines = file_content.split("\n")
-            # 获取文件的行数
-            n_lines_file = len(file_lines)
-            # 获取起始行号和结束行号
-            init_line, final_line = view_range
+
+            # 只读取请求范围内的行，同时获取文件的行数
+            file_content, n_lines_file = await self._read_line_range(
+                path,
+                operator,
+                max(init_line - 1, 0),
+                None if final_line == -1 else max(final_line, 0),
+                stat,
+            )
 
             # 检查起始行号是否有效，如果无效，抛出工具错误
             if init_line < 1 or init_line > n_lines_file:
@@ -325,12 +616,11 @@ class StrReplaceEditor(BaseTool):
                     f"larger or equal than its first `{init_line}`"
                 )
             
-            # 如果结束行号为-1，截取从起始行到文件末尾的内容
-            if final_line == -1:
-                file_content = "\n".join(file_lines[init_line - 1 :])
-            else:
-                # 否则，截取指定行号范围内的内容
-                file_content = "\n".join(file_lines[init_line - 1 : final_line])
+        else:
+            # Read file content; 超出 MAX_RESPONSE_LEN 的部分会被截断，无需读取
+            file_content = await self._read_file_head(
+                path, operator, MAX_RESPONSE_LEN + 1, stat
+            )
 
         # 返回命令行结果，包含格式化后的文件内容
         return CLIResult(
@@ -343,52 +633,74 @@ class StrReplaceEditor(BaseTool):
         old_str: str,
         new_str: Optional[str] = None,
         operator: FileOperator = None,
+        stat: Optional[FileStat] = None,
     ) -> CLIResult:
         """Replace a unique string in a file with a new string."""
-        # Read file content and expand tabs
-        file_content = (await operator.read_file(path)).expandtabs()
-        old_str = old_str.expandtabs()
-        new_str = new_str.expandtabs() if new_str is not None else ""
         # 展开旧字符串的制表符
-        old_str = old_str.expandtabs()
+        old_str = _expand_tabs(old_str)
         # 如果新字符串存在，展开制表符，否则为空字符串
-        new_str = new_str.expandtabs() if new_str is not None else ""
+        new_str = _expand_tabs(new_str) if new_str is not None else ""
+
+        # 空的旧字符串会匹配任意位置，直接拒绝
+        if not old_str:
+            raise ToolError(
+                "Parameter `old_str` must not be empty for command: str_replace"
+            )
+        # 新旧字符串相同时替换不会改变文件，无需读取和写入
+        if new_str == old_str:
+            return CLIResult(
+                output=f"No replacement was performed, new_str is identical to old_str for {path}."
+            )
 
-        # 检查旧字符串在文件中出现的次数
-        occurrences = file_content.count(old_str)
+        # Read file content and expand tabs
+        file_content = _expand_tabs(await self._read_file(path, operator, stat))
+
+        # 只查找前两处出现位置，无需统计全部出现次数
+        first = file_content.find(old_str)
         # 如果旧字符串未出现，抛出工具错误
-        if occurrences == 0:
+        if first < 0:
             raise ToolError(
                 f"No replacement was performed, old_str `{old_str}` did not appear verbatim in {path}."
             )
         # 如果旧字符串出现多次，抛出工具错误并提示行号
         # 没有进行任何替换。在多行{lines}中出现了多次old_str `{old_str}`。请确保它是唯一的
-        elif occurrences > 1:
-            # Find line numbers of occurrences
-            file_content_lines = file_content.split("\n")
-            lines = [
-                idx + 1
-                for idx, line in enumerate(file_content_lines)
-                if old_str in line
-            ]
+        end = first + len(old_str)
+        pos = file_content.find(old_str, end)
+        if pos >= 0:
+            # Find line numbers of occurrences: 依次查找每处出现位置，
+            # 通过行偏移量确定其起始行，无需将文件按行分割
+            offsets = self._line_offsets(path, file_content)
+            lines = [bisect_right(offsets, first)]
+            while pos >= 0:
+                line = bisect_right(offsets, pos)
+                if line != lines[-1]:
+                    lines.append(line)
+                pos = file_content.find(old_str, pos + len(old_str))
             raise ToolError(
                 f"No replacement was performed. Multiple occurrences of old_str `{old_str}` in lines {lines}. Please ensure it is unique"
             )
 
-        # 替换文件内容中的旧字符串为新字符串
-        new_file_content = file_content.replace(old_str, new_str)
+        # 通过切片替换唯一的一处旧字符串，无需再次扫描整个文件
+        new_file_content = file_content[:first] + new_str + file_content[end:]
 
         # 将新内容写入文件
-        await operator.write_file(path, new_file_content)
+        await self._write_file(path, new_file_content, operator)
 
-        # Save the original content to history
-        self._file_history[path].append(file_content)
+        # Save a reverse patch to history instead of the whole original content
+        self._push_history(path, (first, new_str, old_str))
 
-        # 创建编辑部分的代码片段
-        replacement_line = file_content.split(old_str)[0].count("\n")
+        # 创建编辑部分的代码片段：通过行偏移量定位起始行，不再分割整个文件
+        offsets = self._line_offsets(path, file_content)
+        replacement_line = bisect_right(offsets, first) - 1
         start_line = max(0, replacement_line - SNIPPET_LINES)
-        end_line = replacement_line + SNIPPET_LINES + new_str.count("\n")
-        snippet = "\n".join(new_file_content.split("\n")[start_line : end_line + 1])
+        # 从新字符串末尾所在的行起，再向后取 SNIPPET_LINES 行
+        snippet_end = first + len(new_str) - 1
+        for _ in range(SNIPPET_LINES + 1):
+            snippet_end = new_file_content.find("\n", snippet_end + 1)
+            if snippet_end < 0:
+                snippet_end = len(new_file_content)
+                break
+        snippet = new_file_content[offsets[start_line] : snippet_end]
 
         # 准备成功消息
         success_msg = f"The file {path} has been edited. "
@@ -407,16 +719,15 @@ class StrReplaceEditor(BaseTool):
         insert_line: int,
         new_str: str,
         operator: FileOperator = None,
+        stat: Optional[FileStat] = None,
     ) -> CLIResult:
         """Insert text at a specific line in a file."""
         # Read and prepare content
-        file_text = (await operator.read_file(path)).expandtabs()
+        file_text = _expand_tabs(await self._read_file(path, operator, stat))
         # 展开新字符串的制表符
-        new_str = new_str.expandtabs()
-        # 将文件内容按行分割
-        file_text_lines = file_text.split("\n")
-        # 获取文件的行数
-        n_lines_file = len(file_text_lines)
+        new_str = _expand_tabs(new_str)
+        # 获取文件的行数，只统计换行符，无需将文件内容按行分割
+        n_lines_file = file_text.count("\n") + 1
         
         # 检查插入行号是否有效，如果无效，抛出工具错误
         if insert_line < 0 or insert_line > n_lines_file:
@@ -424,28 +735,30 @@ class StrReplaceEditor(BaseTool):
                 f"Invalid `insert_line` parameter: {insert_line}. It should be within the range of lines of the file: {[0, n_lines_file]}"
             )
         
-        # 将新字符串按行分割
-        new_str_lines = new_str.split("\n")
-        # 构建插入新字符串后的文件内容行列表
-        new_file_text_lines = (
-            file_text_lines[:insert_line]
-            + new_str_lines
-            + file_text_lines[insert_line:]
-        )
-        # 构建插入部分的代码片段行列表
-        snippet_lines = (
-            file_text_lines[max(0, insert_line - SNIPPET_LINES) : insert_line]
-            + new_str_lines
-            + file_text_lines[insert_line : insert_line + SNIPPET_LINES]
-        )
-        # 将新的文件内容行列表合并为字符串
-        new_file_text = "\n".join(new_file_text_lines)
-        # 将代码片段行列表合并为字符串
-        snippet = "\n".join(snippet_lines)
-        
+        # 代码片段为插入位置前后各 SNIPPET_LINES 行；只向前查找到片段结尾所需的换行符，
+        # 在原内容中定位后从新内容中切出
+        first_line = max(0, insert_line - SNIPPET_LINES)
+        snippet_start = _advance_lines(file_text, 0, first_line)
+        # 插入到已有行之前时新文本后跟一个换行，插入到末尾时前面跟一个换行
+        if insert_line < n_lines_file:
+            offset = _advance_lines(file_text, snippet_start, insert_line - first_line)
+            inserted = new_str + "\n"
+        else:
+            offset = len(file_text)
+            inserted = "\n" + new_str
+        if insert_line + SNIPPET_LINES < n_lines_file:
+            snippet_end = _advance_lines(file_text, offset, SNIPPET_LINES) - 1
+        else:
+            snippet_end = len(file_text)
+
+        # 在插入位置直接拼接，无需重建整个行列表
+        new_file_text = file_text[:offset] + inserted + file_text[offset:]
+        snippet = new_file_text[snippet_start : snippet_end + len(inserted)]
+
         # 将新内容写入文件
-        await operator.write_file(path, new_file_text)
-        self._file_history[path].append(file_text)
+        await self._write_file(path, new_file_text, operator)
+        # 记录反向补丁
+        self._push_history(path, (offset, inserted, ""))
         # 成功信息拼装
         success_msg = f"The file {path} has been edited. "
         success_msg += self._make_output(
@@ -458,16 +771,33 @@ class StrReplaceEditor(BaseTool):
         return CLIResult(output=success_msg)
 
     async def undo_edit(
-        self, path: PathLike, operator: FileOperator = None
+        self,
+        path: PathLike,
+        operator: FileOperator = None,
+        stat: Optional[FileStat] = None,
     ) -> CLIResult:
         """Revert the last edit made to a file."""
         # 检查文件是否有编辑历史
-        if not self._file_history[path]:
+        history = self._file_history.get(path)
+        if not history:
             raise ToolError(f"No edit history found for {path}.")
-        # 获取并移除最后一次编辑的旧内容
-        old_text = self._file_history[path].pop()
+        entry = history[-1]
+        if isinstance(entry, str):
+            # 完整快照，直接作为旧内容
+            old_text = entry
+        else:
+            # 对当前内容应用反向补丁，先确认插入的文本仍在原处
+            offset, inserted, removed = entry
+            current = await self._read_file(path, operator, stat)
+            if not current.startswith(inserted, offset):
+                raise ToolError(
+                    f"Cannot undo the last edit to {path}: the file has changed since it was edited."
+                )
+            old_text = current[:offset] + removed + current[offset + len(inserted) :]
+        # 移除最后一次编辑的历史
+        self._pop_history(path, entry)
         # 将旧内容写回文件
-        await operator.write_file(path, old_text)
+        await self._write_file(path, old_text, operator)
         # 返回撤销成功的消息
         return CLIResult(
             output=f"Last edit to {path} undone successfully. {self._make_output(old_text, str(path))}"
@@ -485,19 +815,18 @@ class StrReplaceEditor(BaseTool):
         file_content = maybe_truncate(file_content)
         # 如果需要展开制表符
         if expand_tabs:
-            file_content = file_content.expandtabs()
-
-        # 为文件内容的每一行添加行号，并格式化输出
-        file_content = "\n".join(
-            [
-                f"{i + init_line:6}\t{line}"
-                for i, line in enumerate(file_content.split("\n"))
-            ]
+            file_content = _expand_tabs(file_content)
+
+        # 为文件内容的每一行添加行号：用预先绑定的 %-格式化方法批量格式化行号和行，
+        # 避免逐行执行 f-string 的格式化字节码
+        lines = file_content.split("\n")
+        numbered = "\n".join(
+            map("%6d\t%s".__mod__, zip(range(init_line, init_line + len(lines)), lines))
         )
 
         # 返回格式化后的输出字符串，包含文件描述信息
         return (
             f"Here's the result of running `cat -n` on {file_descriptor}:\n"
-            + file_content
+            + numbered
             + "\n"
         )
@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 from app.tool.base import BaseTool
 
 # 描述当请求满足或助手无法进一步执行任务时终止交互的情况
@@ -9,6 +11,8 @@ class Terminate(BaseTool):
     name: str = "terminate"
     # 描述
     description: str = _TERMINATE_DESCRIPTION
+    # 无状态工具，可共享实例
+    stateless: ClassVar[bool] = True
     # 参数
     parameters: dict = {
         "type": "object",
@@ -1,27 +1,46 @@
 """该模块用于管理多个工具的集合类"""
-from typing import Any, Dict, List
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
 
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolFailure, ToolResult
 
 
+@lru_cache(maxsize=128)
+def shared_tool(tool_cls: Type[BaseTool], **kwargs: Any) -> BaseTool:
+    """返回无状态工具的共享实例，按 (工具类, 字段参数) 缓存，避免重复构建 pydantic 模型。
+
+    pydantic 模型只接受关键字参数；作为缓存键，参数值必须可哈希。
+    """
+    # 有状态的工具（如持有会话的 Bash）不能在代理之间共享
+    if not tool_cls.stateless:
+        raise ValueError(f"Tool {tool_cls.__name__} is stateful and cannot be shared")
+    return tool_cls(**kwargs)
+
+
 class ToolCollection:
     """一组定义的工具。"""
     # 初始化方法，接收多个BaseTool类型的工具实例
     def __init__(self, *tools: BaseTool):
-        # 将传入的工具实例保存到实例属性tools中，tools是一个元组
-        self.tools = tools
+        # 将传入的工具实例保存到实例属性tools中，tools是一个列表，添加工具时无需重建
+        self.tools = list(tools)
         # 使用字典推导式创建一个工具名称到工具实例的映射字典tool_map
         self.tool_map = {tool.name: tool for tool in tools}
+        # to_params的缓存结果，工具集合变化时置为None
+        self._params_cache: Optional[List[Dict[str, Any]]] = None
     
-    # 使该类实例可迭代，返回工具实例元组的迭代器
+    # 使该类实例可迭代，返回工具实例列表的迭代器
     def __iter__(self):
         return iter(self.tools)
 
     # 将每个工具转换为参数格式的方法，返回一个列表，列表中的每个元素是一个字典
     def to_params(self) -> List[Dict[str, Any]]:
-        # 使用列表推导式，调用每个工具的to_param方法，将结果收集到列表中返回
-        return [tool.to_param() for tool in self.tools]
+        """返回所有工具的参数格式；结果会被缓存并在每次调用时共享，调用方不应修改。"""
+        # 工具注册后其模式不再变化，只在首次调用或工具集合变化后重新构建
+        if self._params_cache is None:
+            self._params_cache = [tool.to_param() for tool in self.tools]
+        return self._params_cache
 
     # 异步执行指定名称工具的方法，接收工具名称name和工具输入参数tool_input
     async def execute(
@@ -44,23 +63,26 @@ class ToolCollection:
             return ToolFailure(error=e.message)
 
     async def execute_all(self) -> List[ToolResult]:
-        """按顺序依次执行集合中的所有工具。"""
-        # 初始化一个空列表，用于存储所有工具的执行结果
-        results = []
-        # 遍历工具实例元组中的每个工具
-        for tool in self.tools:
+        """并发执行集合中的所有工具，结果按工具的顺序返回。"""
+
+        async def run(tool: BaseTool) -> ToolResult:
             try:
                 # 异步调用工具实例，并等待执行结果
-                result = await tool()
-                # 将工具执行结果添加到results列表中
-                results.append(result)
-            # 如果在工具执行过程中捕获到ToolError异常
+                return await tool()
+            # 如果在工具执行过程中捕获到ToolError异常，返回工具执行失败结果，错误信息为异常中的消息
             except ToolError as e:
-                # 将工具执行失败结果添加到results列表中，错误信息为异常中的消息
-                results.append(ToolFailure(error=e.message))
-        # 返回包含所有工具执行结果（成功或失败）的列表        
+                return ToolFailure(error=e.message)
+
+        # 各工具相互独立，同时执行，总耗时取决于最慢的工具而不是所有工具耗时之和。
+        # 等所有工具都结束后再抛出第一个非 ToolError 异常，不留下仍在后台运行的工具
+        results = await asyncio.gather(
+            *(run(tool) for tool in self.tools), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
         return results
-    
+
     # 根据工具名称获取工具实例的方法
     def get_tool(self, name: str) -> BaseTool:
         # 从tool_map字典中获取指定名称的工具实例并返回，如果未找到则返回None
@@ -68,18 +90,19 @@ class ToolCollection:
     
     # 添加单个工具的方法
     def add_tool(self, tool: BaseTool):
-        # 将传入的工具实例添加到tools元组中
-        self.tools += (tool,)
+        # 将传入的工具实例追加到tools列表中
+        self.tools.append(tool)
         # 将工具名称和工具实例添加到tool_map字典中
         self.tool_map[tool.name] = tool
+        self._params_cache = None
         # 返回当前ToolCollection实例，以便支持链式调用
         return self
 
     # 添加多个工具的方法
     def add_tools(self, *tools: BaseTool):
-        # 遍历传入的每个工具实例
-        for tool in tools:
-            # 调用add_tool方法添加每个工具
-            self.add_tool(tool)
+        # 一次性追加所有工具实例，并批量更新tool_map字典
+        self.tools.extend(tools)
+        self.tool_map.update((tool.name, tool) for tool in tools)
+        self._params_cache = None
         # 返回当前ToolCollection实例，以便支持链式调用
         return self
@@ -2,26 +2,35 @@ import asyncio
 
 from app.agent.manus import Manus
 from app.logger import logger
+from app.tool.browser_use_tool import BrowserUseTool
+from app.tool.google_search import GoogleSearch
 
 
 async def main():
     agent = Manus()
-    while True:
-        try:
-            prompt = input("Enter your prompt (or 'exit'/'quit' to quit): ")
-            prompt_lower = prompt.lower()
-            if prompt_lower in ["exit", "quit"]:
-                logger.info("Goodbye!")
-                break
+    try:
+        while True:
+            try:
+                prompt = input("Enter your prompt (or 'exit'/'quit' to quit): ")
+                prompt_lower = prompt.lower()
+                if prompt_lower in ["exit", "quit"]:
+                    logger.info("Goodbye!")
+                    break
 
-            if not prompt.strip():
-                logger.warning("Skipping empty prompt.")
-                continue
-            logger.info(f"Processing your request prompt: {prompt}...")
-            await agent.run(prompt)
-        except KeyboardInterrupt:
-            logger.warning("Goodbye!")
-            break
+                if not prompt.strip():
+                    logger.warning("Skipping empty prompt.")
+                    continue
+                logger.info(f"Processing your request prompt: {prompt}...")
+                await agent.run(prompt)
+            except KeyboardInterrupt:
+                logger.warning("Goodbye!")
+                break
+    finally:
+        # 退出前释放工具持有的浏览器和网络会话
+        await agent.cleanup()
+        # 共享的浏览器和搜索会话在所有代理清理完后关闭
+        await BrowserUseTool.close_shared_browser()
+        await GoogleSearch.close()
 
 
 if __name__ == "__main__":
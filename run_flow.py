@@ -3,6 +3,8 @@ import asyncio
 from app.agent.manus import Manus
 from app.flow.base import FlowType
 from app.flow.flow_factory import FlowFactory
+from app.tool.browser_use_tool import BrowserUseTool
+from app.tool.google_search import GoogleSearch
 
 
 async def run_flow():
@@ -10,26 +12,33 @@ async def run_flow():
 
     # print("---------------------PlanningFlow---------------------")
 
-    while True:
-        try:
-            prompt = input("Enter your prompt (or 'exit' to quit): ")
-            if prompt.lower() == "exit":
+    try:
+        while True:
+            try:
+                prompt = input("Enter your prompt (or 'exit' to quit): ")
+                if prompt.lower() == "exit":
+                    print("Goodbye!")
+                    break
+
+                # print("---------------------PlanningFlow---------------------")
+                flow = FlowFactory.create_flow(
+                    flow_type=FlowType.PLANNING,
+                    agents=agent,
+                )
+
+                print("Processing your request...")
+                result = await flow.execute(prompt)
+                print(result)
+
+            except KeyboardInterrupt:
                 print("Goodbye!")
                 break
-
-            # print("---------------------PlanningFlow---------------------")
-            flow = FlowFactory.create_flow(
-                flow_type=FlowType.PLANNING,
-                agents=agent,
-            )
-
-            print("Processing your request...")
-            result = await flow.execute(prompt)
-            print(result)
-
-        except KeyboardInterrupt:
-            print("Goodbye!")
-            break
+    finally:
+        # 退出前释放工具持有的浏览器和网络会话
+        await agent.cleanup()
+        # 共享的浏览器和搜索会话在所有代理清理完后关闭
+        await BrowserUseTool.close_shared_browser()
+        await GoogleSearch.close()
 
 
 if __name__ == "__main__":
@@ -1,12 +1,6 @@
 import tempfile
 from pathlib import Path
 from typing import AsyncGenerator
-import sys
-
-
-# 将项目根目录添加到 sys.path，以便导入 app 包
-project_root = Path(__file__).resolve().parent.parent.parent
-sys.path.append(str(project_root))
 
 import pytest
 import pytest_asyncio
@@ -1,16 +1,18 @@
-import docker
-
-# 创建 Docker 客户端，使用默认的命名管道连接
-client = docker.DockerClient(base_url='npipe:////./pipe/docker_engine')
+import time
 
-try:
-    # 获取 Docker 版本信息
-    version = client.version()
-    print("Docker 版本信息：", version)
+import docker
+import pytest
 
-    # 列出所有容器
-    containers = client.containers.list()
-    print("当前运行的容器：", containers)
 
-except docker.errors.DockerException as e:
-    print("连接 Docker API 失败：", e)
\ No newline at end of file
+def test_docker_reachable():
+    """确认 Docker 守护进程可以连接，无法连接时跳过。"""
+    try:
+        # 使用环境中的默认配置连接 Docker，适用于 Linux 和 Windows
+        client = docker.from_env()
+        # 读取一段已经结束的事件流：守护进程可连接时立即返回
+        now = int(time.time())
+        events = list(client.events(since=now, until=now, decode=True))
+        client.close()
+    except docker.errors.DockerException as e:
+        pytest.skip(f"连接 Docker API 失败：{e}")
+    assert isinstance(events, list)
@@ -1,13 +1,6 @@
 import pytest
 import pytest_asyncio
 
-import sys
-from pathlib import Path
-
-# 将项目根目录添加到 sys.path，以便导入 app 包
-project_root = Path(__file__).resolve().parent.parent.parent
-sys.path.append(str(project_root))
-
 from app.sandbox.core.sandbox import DockerSandbox, SandboxConfig
 
 
@@ -0,0 +1,41 @@
+import os
+import stat
+
+import pytest
+
+from app.tool.file_operators import LocalFileOperator
+
+
+@pytest.fixture
+def operator():
+    return LocalFileOperator()
+
+
+@pytest.mark.asyncio
+async def test_write_file_preserves_mode(operator, tmp_path):
+    """测试覆盖写入已有文件时保留其权限位。"""
+    path = tmp_path / "script.sh"
+    path.write_text("old\n")
+    path.chmod(0o750)
+
+    await operator.write_file(path, "new\n")
+
+    assert path.read_text() == "new\n"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o750
+    # 临时文件已被重命名到目标位置，不会残留在目录中
+    assert os.listdir(tmp_path) == ["script.sh"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+@pytest.mark.asyncio
+async def test_write_file_through_symlink(operator, tmp_path):
+    """测试通过符号链接写入时修改的是目标文件，链接本身保持不变。"""
+    target = tmp_path / "target.txt"
+    target.write_text("old\n")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    await operator.write_file(link, "new\n")
+
+    assert link.is_symlink()
+    assert target.read_text() == "new\n"
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("googlesearch")
+
+from app.tool.google_search import GoogleSearch, _parse_links
+
+
+# 简化的搜索结果页面，结构与 googlesearch 库解析的无 JavaScript 版结果页一致
+RESULTS_PAGE = """
+<html><body>
+<div class="ezO2md">
+  <a href="/url?q=https://example.com/a%3Fx%3D1&amp;sa=U&amp;ved=abc">Example A</a>
+</div>
+<div class="ezO2md"><span>no link here</span></div>
+<div class="other"><a href="/url?q=https://ignored.example.com/">Ignored</a></div>
+<div class="ezO2md">
+  <a href="/url?q=https://example.org/b&amp;sa=U">Example B</a>
+</div>
+</body></html>
+"""
+
+
+def test_parse_links():
+    """测试只从结果块中解析链接，并去掉跳转前缀和追踪参数。"""
+    assert _parse_links(RESULTS_PAGE) == [
+        "https://example.com/a?x=1",
+        "https://example.org/b",
+    ]
+
+
+def test_parse_links_empty_page():
+    """测试没有结果块的页面返回空列表。"""
+    assert _parse_links("<html><body></body></html>") == []
+
+
+def test_session_replaced_when_loop_changes():
+    """测试事件循环变化时，旧的共享会话在被替换前会被关闭。"""
+    old = asyncio.run(GoogleSearch._get_session())
+
+    async def replace():
+        new = await GoogleSearch._get_session()
+        await GoogleSearch.close()
+        return new
+
+    new = asyncio.run(replace())
+    assert new is not old
+    assert old.closed
+    assert new.closed
@@ -1,22 +1,87 @@
 import asyncio
-import sys
-from pathlib import Path
 
-# 将项目根目录添加到 sys.path，以便导入 app 包
-project_root = Path(__file__).resolve().parent.parent
-sys.path.append(str(project_root))
+import pytest
 
 from app.tool.python_execute import PythonExecute
 
-# 定义一个异步函数来调用 execute 方法
-async def test_python_execute():
-    # 创建 PythonExecute 工具实例
-    python_tool = PythonExecute()
 
+@pytest.fixture(scope="module")
+def python_tool():
+    """整个模块共用一个 PythonExecute 实例，复用其常驻的工作进程。"""
+    return PythonExecute()
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ('print("Hello, World!")', "Hello, World!"),
+        ("print(1)", "1"),
+        ("print(2 + 2)", "4"),
+        ("print(sum(range(10)))", "45"),
+    ],
+)
+@pytest.mark.asyncio(loop_scope="module")
+async def test_python_execute(python_tool, code, expected):
+    """测试执行代码并捕获打印输出。"""
     # 调用 execute 方法，传递要执行的代码和超时时间
-    result = await python_tool.execute(code='print("Hello, World!")', timeout=5)
-    # 打印执行结果
-    print(result)
+    result = await python_tool.execute(code=code, timeout=5)
+    assert expected in result["observation"]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_python_execute_concurrent(python_tool):
+    """测试并发执行多段相互独立的代码，各自的输出互不干扰。"""
+    codes = ["print(1)", "print(2)", "print(3)"]
+    results = await asyncio.gather(
+        *(python_tool.execute(code=code, timeout=5) for code in codes)
+    )
+    for i, result in enumerate(results, start=1):
+        assert result["observation"].strip() == str(i)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_python_execute_large_output(python_tool):
+    """测试大量输出能完整返回，且不会因逐字节读取而超时。"""
+    result = await python_tool.execute(
+        code="import sys; sys.stdout.write('x' * 8_000_000)", timeout=10
+    )
+    assert len(result["observation"]) >= 8_000_000
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_python_execute_state_isolated(python_tool):
+    """测试一次执行对进程状态的修改不会泄漏到之后的执行中。"""
+    await python_tool.execute(
+        code=(
+            "import os, json\n"
+            "os.environ['LEAKED_VAR'] = '1'\n"
+            "os.chdir('/')\n"
+            "json.leaked = True\n"
+        ),
+        timeout=5,
+    )
+    result = await python_tool.execute(
+        code=(
+            "import os, json\n"
+            "print(os.environ.get('LEAKED_VAR'), os.getcwd() == '/',"
+            " hasattr(json, 'leaked'))\n"
+        ),
+        timeout=5,
+    )
+    assert result["observation"].strip() == "None False False"
+
 
-# 运行异步函数
-asyncio.run(test_python_execute())
\ No newline at end of file
+@pytest.mark.asyncio(loop_scope="module")
+async def test_python_execute_can_start_processes(python_tool):
+    """测试执行的代码可以启动自己的子进程。"""
+    result = await python_tool.execute(
+        code=(
+            "import multiprocessing\n"
+            "p = multiprocessing.Process(target=int)\n"
+            "p.start()\n"
+            "p.join()\n"
+            "print(p.exitcode)\n"
+        ),
+        timeout=5,
+    )
+    assert result["observation"].strip() == "0"
@@ -0,0 +1,166 @@
+import shutil
+import subprocess
+
+import pytest
+
+from app.exceptions import ToolError
+from app.tool import str_replace_editor
+from app.tool.str_replace_editor import StrReplaceEditor
+
+
+@pytest.fixture
+def editor():
+    return StrReplaceEditor()
+
+
+@pytest.mark.asyncio
+async def test_undo_create_restores_created_content(editor, tmp_path):
+    """测试撤销 create 时写回创建时的内容，而不是删除文件。"""
+    path = tmp_path / "created.txt"
+    await editor.execute(command="create", path=str(path), file_text="created\n")
+    path.write_text("created\nuser data\n")
+
+    await editor.execute(command="undo_edit", path=str(path))
+
+    assert path.read_text() == "created\n"
+    with pytest.raises(ToolError, match="No edit history"):
+        await editor.execute(command="undo_edit", path=str(path))
+
+
+@pytest.mark.asyncio
+async def test_undo_refuses_when_edited_text_changed(editor, tmp_path):
+    """测试被编辑的文本在外部被修改后，撤销会拒绝执行且不改动文件。"""
+    path = tmp_path / "edited.txt"
+    path.write_text("alpha\nbeta\n")
+    await editor.execute(
+        command="str_replace", path=str(path), old_str="beta", new_str="gamma"
+    )
+    path.write_text("alpha\ndelta\n")
+
+    with pytest.raises(ToolError, match="has changed since it was edited"):
+        await editor.execute(command="undo_edit", path=str(path))
+    assert path.read_text() == "alpha\ndelta\n"
+
+
+@pytest.mark.asyncio
+async def test_view_range(editor, tmp_path):
+    """测试按行范围查看时只显示请求的行，且行号从起始行开始。"""
+    path = tmp_path / "lines.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 6)))
+
+    output = await editor.execute(command="view", path=str(path), view_range=[2, 3])
+    assert "     2\tline 2\n     3\tline 3\n" in output
+    assert "line 1" not in output and "line 4" not in output
+
+    output = await editor.execute(command="view", path=str(path), view_range=[4, -1])
+    assert "     4\tline 4\n     5\tline 5\n" in output
+    assert "line 3" not in output
+
+    with pytest.raises(ToolError, match="Invalid `view_range`"):
+        await editor.execute(command="view", path=str(path), view_range=[0, 2])
+
+
+@pytest.mark.asyncio
+async def test_undo_multiple_edits(editor, tmp_path):
+    """测试连续多次撤销依次恢复每次编辑之前的内容。"""
+    path = tmp_path / "multi.txt"
+    original = "one\ntwo\nthree\n"
+    path.write_text(original)
+
+    await editor.execute(
+        command="str_replace", path=str(path), old_str="two", new_str="TWO"
+    )
+    after_replace = path.read_text()
+    await editor.execute(command="insert", path=str(path), insert_line=1, new_str="1.5")
+    after_insert = path.read_text()
+    await editor.execute(
+        command="str_replace", path=str(path), old_str="three\n", new_str=""
+    )
+    assert path.read_text() == "one\n1.5\nTWO\n"
+
+    await editor.execute(command="undo_edit", path=str(path))
+    assert path.read_text() == after_insert
+    await editor.execute(command="undo_edit", path=str(path))
+    assert path.read_text() == after_replace
+    await editor.execute(command="undo_edit", path=str(path))
+    assert path.read_text() == original
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_by_external_write(editor, tmp_path):
+    """测试文件在外部被修改后，缓存的内容不会被继续使用。"""
+    path = tmp_path / "cached.txt"
+    path.write_text("before\n")
+    await editor.execute(command="view", path=str(path))
+
+    path.write_text("after the external write\n")
+
+    output = await editor.execute(command="view", path=str(path))
+    assert "after the external write" in output
+    await editor.execute(
+        command="str_replace", path=str(path), old_str="external", new_str="outside"
+    )
+    assert path.read_text() == "after the outside write\n"
+
+
+@pytest.mark.asyncio
+async def test_history_evicted_per_path(editor, tmp_path, monkeypatch):
+    """测试每个文件的编辑历史超出条数上限时淘汰最早的一条。"""
+    monkeypatch.setattr(str_replace_editor, "HISTORY_MAX_PER_PATH", 2)
+    path = tmp_path / "evict.txt"
+    path.write_text("a\n")
+    for old, new in (("a", "b"), ("b", "c"), ("c", "d")):
+        await editor.execute(
+            command="str_replace", path=str(path), old_str=old, new_str=new
+        )
+
+    await editor.execute(command="undo_edit", path=str(path))
+    await editor.execute(command="undo_edit", path=str(path))
+    assert path.read_text() == "b\n"
+    with pytest.raises(ToolError, match="No edit history"):
+        await editor.execute(command="undo_edit", path=str(path))
+
+
+@pytest.mark.asyncio
+async def test_history_evicted_by_total_size(editor, tmp_path, monkeypatch):
+    """测试编辑历史超出总字符数上限时，先淘汰最久未编辑文件的历史。"""
+    monkeypatch.setattr(str_replace_editor, "HISTORY_MAX_TOTAL_CHARS", 150)
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("x" * 100 + "\n")
+    second.write_text("y" * 100 + "\n")
+    await editor.execute(
+        command="str_replace", path=str(first), old_str="x" * 100, new_str="x"
+    )
+    await editor.execute(
+        command="str_replace", path=str(second), old_str="y" * 100, new_str="y"
+    )
+
+    with pytest.raises(ToolError, match="No edit history"):
+        await editor.execute(command="undo_edit", path=str(first))
+    await editor.execute(command="undo_edit", path=str(second))
+    assert second.read_text() == "y" * 100 + "\n"
+
+
+@pytest.mark.skipif(shutil.which("find") is None, reason="find is not available")
+@pytest.mark.asyncio
+async def test_view_directory_matches_find(editor, tmp_path):
+    """测试查看目录时列出的路径与 find 命令的输出一致。"""
+    (tmp_path / "pkg" / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "pkg" / "module.py").write_text("")
+    (tmp_path / "pkg" / "sub" / "leaf.txt").write_text("")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "secret.txt").write_text("")
+    (tmp_path / "top.txt").write_text("")
+
+    output = await editor.execute(command="view", path=str(tmp_path))
+    header, _, listing = output.partition("excluding hidden items:\n")
+    assert header.startswith("Here's the files and directories up to 2 levels deep")
+
+    expected = subprocess.run(
+        ["find", str(tmp_path), "-maxdepth", "2", "-not", "-path", "*/.*"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert sorted(listing.split()) == sorted(expected.split())
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from pydantic import ConfigDict
+
+from app.exceptions import ToolError
+from app.tool.base import BaseTool
+from app.tool.tool_collection import ToolCollection
+
+
+class SlowTool(BaseTool):
+    name: str = "slow"
+    description: str = "Finishes after a short delay."
+    finished: bool = False
+
+    async def execute(self) -> str:
+        await asyncio.sleep(0.05)
+        self.finished = True
+        return "done"
+
+
+class FailingTool(BaseTool):
+    name: str = "failing"
+    description: str = "Raises the given exception."
+    error: Exception
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> str:
+        raise self.error
+
+
+@pytest.mark.asyncio
+async def test_execute_all_tool_error_becomes_failure():
+    """测试工具抛出的 ToolError 转换为失败结果，其他工具的结果按顺序返回。"""
+    tools = ToolCollection(FailingTool(error=ToolError("boom")), SlowTool())
+    results = await tools.execute_all()
+    assert results[0].error == "boom"
+    assert results[1] == "done"
+
+
+@pytest.mark.asyncio
+async def test_execute_all_waits_for_other_tools_before_raising():
+    """测试非 ToolError 异常在所有工具结束后才抛出，不会留下仍在运行的工具。"""
+    slow = SlowTool()
+    tools = ToolCollection(FailingTool(error=ValueError("bad")), slow)
+    with pytest.raises(ValueError, match="bad"):
+        await tools.execute_all()
+    assert slow.finished